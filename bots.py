@@ -5,7 +5,10 @@ Currently implements:
 """
 from __future__ import annotations
 import numpy as np
-from typing import Any, Dict
+from typing import Any, Dict, Tuple
+
+from market_engine import SIGN
+from market_kernels import score_candidates, sweep
 
 class MarketMaker:
     """A simple liquidity provider that posts a buy and a sell around the true price.
@@ -29,9 +32,10 @@ class MarketMaker:
     def on_tick(self, engine: Any) -> None:
         center = float(engine.true_price)
         mid = center
-        # Small random jitter so orders are not exactly symmetric every tick
-        buy_price = mid - self.spread / 2.0 + float(self.rng.normal(0, self.jitter))
-        sell_price = mid + self.spread / 2.0 + float(self.rng.normal(0, self.jitter))
+        # Small random jitter so orders are not exactly symmetric every tick (one draw for both quotes)
+        jitter = self.rng.normal(0, self.jitter, 2)
+        buy_price = mid - self.spread / 2.0 + float(jitter[0])
+        sell_price = mid + self.spread / 2.0 + float(jitter[1])
 
         buy_order: Dict[str, Any] = {'side': 'buy', 'price': float(buy_price), 'size': self.size, 'bot': self}
         sell_order: Dict[str, Any] = {'side': 'sell', 'price': float(sell_price), 'size': self.size, 'bot': self}
@@ -61,12 +65,14 @@ class NoiseTrader:
 
     def on_tick(self, engine: Any) -> None:
         n = max(0, int(self.rng.poisson(self.intensity)))
+        if n == 0:
+            return
         center = float(engine.true_price)
-        for _ in range(n):
-            side = 'buy' if self.rng.random() < 0.5 else 'sell'
-            price = center + self.rng.normal(0, self.spread)
-            size = max(0.01, float(self.rng.exponential(self.size_mean)))
-            engine.place_order({'side': side, 'price': float(price), 'size': size, 'bot': self})
+        # draw every order's side, price and size for this tick in three vector calls
+        sides = np.where(self.rng.random(n) < 0.5, 'buy', 'sell')
+        prices = center + self.rng.normal(0, self.spread, n)
+        sizes = np.maximum(0.01, self.rng.exponential(self.size_mean, n))
+        engine.place_orders_batch(sides, prices, sizes, bot=self)
 
 
 class InformedTrader:
@@ -89,14 +95,16 @@ class InformedTrader:
         self.rng = rng if rng is not None else np.random.default_rng()
 
     def on_tick(self, engine: Any) -> None:
-        if self.rng.random() > self.activity_prob:
+        # one draw for the activity check and one for the random direction
+        u = self.rng.random(2)
+        if u[0] > self.activity_prob:
             return
         mid = float(engine.true_price)
         side = None
         if self.direction in ('buy', 'sell'):
             side = self.direction
         else:
-            side = 'buy' if self.rng.random() < 0.5 else 'sell'
+            side = 'buy' if u[1] < 0.5 else 'sell'
 
         if side == 'buy':
             engine.place_order({'side': 'buy', 'price': mid + 1e6, 'size': self.size, 'bot': self})
@@ -111,7 +119,9 @@ class SplittingBot:
     - Call `start_order(side, total_size, slices)` to begin an execution
     - On each tick, the bot executes one slice by calling `engine.execute_market_order`
       which performs a market sweep for the slice size.
-    - Records slices in `executions` for inspection in tests.
+    - Records slices in `executions` for inspection in tests; `executions_arrays()` returns
+      the executed sizes and vwaps as float64 columns. Assigning `executions` (e.g. `[]` to
+      clear it) rebuilds the columns, so the two always describe the same records.
 
     Parameters
     ----------
@@ -127,7 +137,35 @@ class SplittingBot:
         self.remaining = 0.0
         self.slices = 0
         self.slice = 0
-        self.executions: list[dict] = []
+        self.executions = []
+
+    @property
+    def executions(self) -> list[dict]:
+        return self._executions
+
+    @executions.setter
+    def executions(self, records: list[dict]) -> None:
+        self._executions = records
+        # per-slice executed size and vwap, preallocated and grown by doubling
+        n = len(records)
+        self._exec_size = np.empty(max(16, n), dtype=np.float64)
+        self._exec_vwap = np.empty(max(16, n), dtype=np.float64)
+        self._exec_size[:n] = [r['executed_size'] for r in records]
+        self._exec_vwap[:n] = [r['vwap'] or 0.0 for r in records]
+        self._n_exec = n
+
+    def executions_arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        """`(executed_size, vwap)` of each slice so far, as views; vwap is 0.0 where nothing filled."""
+        return self._exec_size[:self._n_exec], self._exec_vwap[:self._n_exec]
+
+    def _record_execution(self, res: dict) -> None:
+        self.executions.append(res)
+        if self._n_exec == self._exec_size.size:
+            self._exec_size = np.resize(self._exec_size, 2 * self._n_exec)
+            self._exec_vwap = np.resize(self._exec_vwap, 2 * self._n_exec)
+        self._exec_size[self._n_exec] = res['executed_size']
+        self._exec_vwap[self._n_exec] = res['vwap'] or 0.0
+        self._n_exec += 1
 
     def start_order(self, side: str, total_size: float, slices: int | None = None) -> None:
         self.side = str(side)
@@ -152,7 +190,7 @@ class SplittingBot:
 
         # execute a market slice
         res = engine.execute_market_order(self.side, this_slice)
-        self.executions.append(res)
+        self._record_execution(res)
         self.remaining -= res['executed_size']
         self.slice += 1
         if self.remaining <= 0 or self.slice >= self.slices:
@@ -198,17 +236,9 @@ class AdaptiveSplittingBot:
         self.executions = []
 
     def _best_visible_liquidity(self, engine: Any) -> float:
-        df = engine.get_cumulative_depth()
-        if df.empty:
-            return 0.0
         # For buy orders we care about asks, for sell orders we care about bids
         target_side = 'sell' if self.side == 'buy' else 'buy'
-        s = df[df['side'] == target_side]
-        if s.empty:
-            return 0.0
-        # best level is first row in csv ordering (our get_cumulative_depth returns best first for each side)
-        best_level = s.iloc[0]
-        return float(best_level['cum_size'])
+        return float(engine.best_level_size(target_side))
 
     def on_tick(self, engine: Any) -> None:
         if not self.active or self.remaining <= 0:
@@ -262,13 +292,28 @@ class GreedyLookaheadBot:
         self.active = True
         self.executions = []
 
-    def _simulate_with_candidate(self, engine: Any, first_slice: float) -> float:
+    def _book_snapshot(self, engine: Any) -> Tuple[np.ndarray, np.ndarray, float | None]:
+        """Capture the passive side's level arrays and the opposite side's best price once per tick."""
+        if self.side == 'buy':
+            prices, sizes = engine.level_arrays('sell')
+            other_best = engine.best_bid()
+        else:
+            prices, sizes = engine.level_arrays('buy')
+            other_best = engine.best_ask()
+        return prices, sizes, other_best
+
+    def _simulate_with_candidate(self, engine: Any, first_slice: float,
+                                 snapshot: Tuple[np.ndarray, np.ndarray, float | None] | None = None) -> float:
         """Return estimated average execution price (total_cost / total_executed)
         when taking `first_slice` now and then greedy repeating of `first_slice` for
         the remaining horizon on a simulated book (adding heuristic MM liquidity each tick).
+
+        The simulation runs on a copy of the passive side's level sizes from `snapshot`
+        (taken from the engine if omitted); only the passive side changes while we sweep.
         """
-        # start from a copy of the book
-        sim_book = [dict(o) for o in engine.order_book]
+        prices, sizes, other_best = snapshot if snapshot is not None else self._book_snapshot(engine)
+        sizes = sizes.copy()
+        sign = SIGN.get(self.side, -1)
         total_cost = 0.0
         total_executed = 0.0
 
@@ -276,31 +321,28 @@ class GreedyLookaheadBot:
             s = first_slice if step == 0 else first_slice
             if s <= 0:
                 break
-            res = engine.simulate_market_order(self.side, s, book=sim_book)
-            executed = res['executed_size']
-            if executed > 0 and res['vwap'] is not None:
-                total_cost += executed * res['vwap']
+            executed, cost = sweep(prices, sizes, float(s))
+            if executed > 0:
+                total_cost += cost
                 total_executed += executed
-            # update sim_book from result
-            sim_book = res['book']
 
             # heuristic: assume market makers add some liquidity at the best level
             # compute mid and add one ask (if buying) or bid (if selling)
-            bids = [o for o in sim_book if o['side'] == 'buy']
-            asks = [o for o in sim_book if o['side'] == 'sell']
-            if bids and asks:
-                best_bid = max(b['price'] for b in bids)
-                best_ask = min(a['price'] for a in asks)
-                mid = 0.5 * (best_bid + best_ask)
+            live = np.flatnonzero(sizes > 0)
+            if live.size and other_best is not None:
+                mid = 0.5 * (float(prices[live[0]]) + other_best)
                 # add liquidity on passive side
-                add_price = mid + 0.5 if self.side == 'buy' else mid - 0.5
-                new_order = {'side': 'sell' if self.side == 'buy' else 'buy', 'price': float(add_price), 'size': float(self.mm_assume_size), 'bot': None, '_id': -9999 - step}
-                sim_book.append(new_order)
+                add_price = mid + 0.5 * sign
             else:
                 # if no bids/asks, add a synthetic level
-                add_price = engine.true_price + 1.0 if self.side == 'buy' else engine.true_price - 1.0
-                new_order = {'side': 'sell' if self.side == 'buy' else 'buy', 'price': float(add_price), 'size': float(self.mm_assume_size), 'bot': None, '_id': -9999 - step}
-                sim_book.append(new_order)
+                add_price = engine.true_price + 1.0 * sign
+            # keep levels best-first: ascending asks when buying, descending bids when selling
+            if sign > 0:
+                pos = int(np.searchsorted(prices, add_price, side='left'))
+            else:
+                pos = int(np.searchsorted(-prices, -add_price, side='left'))
+            prices = np.insert(prices, pos, add_price)
+            sizes = np.insert(sizes, pos, self.mm_assume_size)
 
         if total_executed == 0:
             return float('inf')
@@ -309,11 +351,12 @@ class GreedyLookaheadBot:
     def _choose_slice(self, engine: Any) -> float:
         best_s = self.candidates[0]
         best_avg = float('inf')
+        snapshot = self._book_snapshot(engine)
         for c in self.candidates:
             s = max(0.0, min(c, self.remaining))
             if s <= 0:
                 continue
-            avg_price = self._simulate_with_candidate(engine, s)
+            avg_price = self._simulate_with_candidate(engine, s, snapshot)
             if avg_price < best_avg:
                 best_avg = avg_price
                 best_s = s
@@ -370,35 +413,21 @@ class GreedyAdaptiveBot:
 
     def _choose_slice(self, engine: Any) -> float:
         # compute mid price
-        bids = [o for o in engine.order_book if o['side'] == 'buy']
-        asks = [o for o in engine.order_book if o['side'] == 'sell']
-        if not bids or not asks:
+        best_bid = engine.best_bid()
+        best_ask = engine.best_ask()
+        if best_bid is None or best_ask is None:
             # no mid defined; fall back to min_slice
             return self.min_slice
-        best_bid = max([b['price'] for b in bids])
-        best_ask = min([a['price'] for a in asks])
         mid = 0.5 * (best_bid + best_ask)
 
-        best_candidate = self.min_slice
-        best_price_per_unit = float('inf')
-
-        for c in self.candidates:
-            s = max(self.min_slice, min(self.max_slice, min(c, self.remaining)))
-            if s <= 0:
-                continue
-            # estimate bps using the engine's simulator (non-mutating)
-            bps = engine.calculate_price_impact(self.side, int(max(1, round(s))))
-            # convert bps back to estimated avg execution price
-            if self.side == 'buy':
-                est_price = mid * (1.0 + bps / 10000.0)
-            else:
-                est_price = mid * (1.0 - bps / 10000.0)
-            # cost per unit is est_price; for buys lower is better
-            if est_price < best_price_per_unit:
-                best_price_per_unit = est_price
-                best_candidate = s
-
-        return float(best_candidate)
+        # clamp every candidate, then score them all against the passive side in one kernel call;
+        # each is evaluated at the whole-unit quantity `calculate_price_impact` would be given
+        sizes = np.maximum(self.min_slice, np.minimum(self.max_slice, np.minimum(np.asarray(self.candidates, dtype=np.float64), self.remaining)))
+        quantities = np.where(sizes > 0, np.maximum(1.0, np.round(sizes)), 0.0)
+        prices, level_sizes = engine.level_arrays('sell' if self.side == 'buy' else 'buy')
+        best = score_candidates(prices, level_sizes, mid, quantities, self.side == 'buy')
+        # cost per unit is the estimated price; for buys lower is better
+        return float(sizes[best]) if best >= 0 else self.min_slice
 
     def on_tick(self, engine: Any) -> None:
         if not self.active or self.remaining <= 0:
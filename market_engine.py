@@ -2,53 +2,408 @@
 
 Implements:
 - MarketEngine: simple random-walk true price, limit order book, matching, and market orders
+- The book is indexed by price level: two SortedDicts (bids keyed by -price, asks by price)
+  mapping to FIFO deques of orders, so best-of-book is O(1) and matching pops from the head
 - Methods used by the tests: place_order, _match_orders, execute_market_order, get_cumulative_depth
 - calculate_price_impact: simulates filling a market order (without mutating the book) and returns slippage in bps
+- Optional LOB logging: every `log_every_n_ticks` ticks a level snapshot is queued and written
+  as a JSON line to `log_path` by a background thread, keeping file I/O off the tick loop
 """
 from __future__ import annotations
-from typing import Any, Dict, List, Optional
+import json
+import queue
+import atexit
+import functools
+import threading
+from collections import abc, deque
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
 import numpy as np
 import pandas as pd
+from sortedcontainers import SortedDict
+
+from market_kernels import price_impact, price_impact_curve
+
+
+# (tick, true_price, (bid_prices, bid_sizes), (ask_prices, ask_sizes))
+_Snapshot = Tuple[int, float, Tuple[np.ndarray, np.ndarray], Tuple[np.ndarray, np.ndarray]]
+
+# +1 for buy, -1 for sell: signed prices sort best-first as `-sign * price` for the side's book
+SIGN: Dict[str, int] = {'buy': 1, 'sell': -1}
+
+TRADE_DTYPE = np.dtype([('tick', np.int64), ('price', np.float64), ('size', np.float64)])
+
+
+class _SnapshotLogger:
+    """Background writer for LOB snapshots: `submit` enqueues, a daemon thread batches writes.
+
+    Records are `(tick, true_price, bids, asks)` with each side a `(prices, sizes)` pair of the
+    engine's read-only level arrays (replaced, never mutated, on book changes), so the tick loop
+    hands them over without copying and JSON formatting happens on the writer thread.
+
+    The writer is a daemon thread; if `close()` is never called, an `atexit` hook still flushes
+    the queue at interpreter exit. A logger holds a
+    thread and an open file, so it (and an engine that owns one) cannot be copied or pickled.
+    """
+
+    def __init__(self, path: str) -> None:
+        self._queue: queue.Queue[_Snapshot | None] = queue.Queue()
+        self._file = open(path, 'w', encoding='utf-8')
+        self._writer = threading.Thread(target=self._drain, name='lob-logger', daemon=True)
+        self._writer.start()
+        # a per-logger partial, so `close()` unregisters only this logger's hook
+        self._flush_at_exit = functools.partial(_SnapshotLogger._stop, self._queue, self._writer)
+        atexit.register(self._flush_at_exit)
+
+    @staticmethod
+    def _stop(q: queue.Queue[_Snapshot | None], writer: threading.Thread) -> None:
+        q.put(None)
+        writer.join()
+
+    def __reduce__(self) -> Any:
+        raise TypeError("a MarketEngine with a LOB logger (log_path) cannot be copied or pickled; "
+                        "close() it first")
+
+    def submit(self, record: _Snapshot) -> None:
+        self._queue.put(record)
+
+    @staticmethod
+    def _format(record: _Snapshot) -> str:
+        tick, true_price, bids, asks = record
+        book = [{'side': side, 'price': p, 'size': sz}
+                for side, (prices, sizes) in (('buy', bids), ('sell', asks))
+                for p, sz in zip(prices.tolist(), sizes.tolist())]
+        return json.dumps({'tick': tick, 'true_price': true_price, 'book': book}) + '\n'
+
+    def _drain(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            done = batch[-1] is None
+            self._file.writelines(self._format(r) for r in batch if r is not None)
+            self._file.flush()
+            if done:
+                self._file.close()
+                return
+
+    def close(self) -> None:
+        atexit.unregister(self._flush_at_exit)
+        self._flush_at_exit()
+
+
+ORDER_FIELDS = ('side', 'price', 'size', 'bot', '_id')
+
+
+class Order:
+    """A resting limit order with fixed fields (side, price, size, bot, _id).
+
+    The engine uses attribute access (`o.price`). Orders stay compatible with the
+    earlier dict orders: `Order` is registered as a `collections.abc.Mapping` over its fields,
+    so `o['price']`, `o.get('bot')`, `o.items()`, `dict(o)` and `pd.DataFrame(orders)` work.
+    Equality and hashing stay by identity.
+    """
+
+    __slots__ = ORDER_FIELDS
+
+    def __init__(self, side: str, price: float, size: float, bot: Any = None, _id: int = -1) -> None:
+        self.side = side
+        self.price = price
+        self.size = size
+        self.bot = bot
+        self._id = _id
+
+    def keys(self) -> Tuple[str, ...]:
+        return ORDER_FIELDS
+
+    def values(self) -> List[Any]:
+        return [self.side, self.price, self.size, self.bot, self._id]
+
+    def items(self) -> List[Tuple[str, Any]]:
+        return list(zip(ORDER_FIELDS, self.values()))
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(ORDER_FIELDS)
+
+    def __len__(self) -> int:
+        return len(ORDER_FIELDS)
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in ORDER_FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key not in ORDER_FIELDS:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key: object) -> bool:
+        return key in ORDER_FIELDS
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key) if key in ORDER_FIELDS else default
+
+    def __reduce__(self) -> Tuple[Any, Tuple[Any, ...]]:
+        # rebuild through `__init__`: a mypyc-compiled `Order` has no slot-state pickling
+        return Order, (self.side, self.price, self.size, self.bot, self._id)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'side': self.side, 'price': self.price, 'size': self.size, 'bot': self.bot, '_id': self._id}
+
+    def __repr__(self) -> str:
+        return f"Order(side={self.side!r}, price={self.price!r}, size={self.size!r}, bot={self.bot!r}, _id={self._id!r})"
+
+
+# a virtual subclass: subclassing Mapping would bring content-based `__eq__` and drop `__hash__`
+abc.Mapping.register(Order)
 
 
 class MarketEngine:
     """A very small matching engine for testing and demo purposes.
 
-    Orders are simple dicts: {'side': 'buy'|'sell', 'price': float, 'size': float, 'bot': Any}
+    Orders are submitted as dicts: {'side': 'buy'|'sell', 'price': float, 'size': float, 'bot': Any}
+    and stored as `Order` objects, which also support dict-style reads.
+
+    Resting orders live in `bids` (keyed by -price) and `asks` (keyed by price); each key maps
+    to a deque of orders in arrival order. `orders_by_id` indexes the same orders by `_id`, and
+    `level_size[(side, price)]` holds the total resting size per level, kept up to date on every
+    mutation so top-of-book reads never touch individual orders. Numeric read paths work on
+    per-side `(prices, sizes)` level arrays, cached until the next mutation.
+
+    The level index type is the `level_index` class attribute (`SortedDict`). A subclass can
+    swap in another sorted mapping that provides `peekitem`, ordered `keys()`/`values()` and
+    dict-style get/set/del/clear.
+
+    `trade_history` is a NumPy structured array with fields (tick, price, size). When `log_path`
+    is given, a `{'tick', 'true_price', 'book'}` level snapshot is logged every
+    `log_every_n_ticks` ticks; call `close()` (or use the engine as a context manager) to
+    flush the log. While the logger is open the engine cannot be copied or pickled, so it cannot
+    be handed to `MultiEngine`.
     """
 
-    def __init__(self, init_price: float = 100.0, vol: float = 0.5, rng: np.random.Generator | None = None):
+    level_index: type = SortedDict
+
+    def __init__(self, init_price: float = 100.0, vol: float = 0.5, rng: np.random.Generator | None = None,
+                 *, log_path: str | None = None, log_every_n_ticks: int = 30) -> None:
         self.true_price = float(init_price)
         self.vol = float(vol)
         self.rng = rng if rng is not None else np.random.default_rng()
 
-        self.order_book: List[Dict[str, Any]] = []
-        self.trade_history: List[Dict[str, Any]] = []
+        self.bids: SortedDict = self.level_index()
+        self.asks: SortedDict = self.level_index()
+        self.orders_by_id: Dict[int, Order] = {}
+        self.level_size: Dict[Tuple[str, float], float] = {}
+        self._levels_cache: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self._trades = np.empty(256, dtype=TRADE_DTYPE)
+        self._n_trades = 0
         self.bots: List[Any] = []
-        self.true_history: List[float] = [self.true_price]
+        # latent price path, preallocated and grown by doubling; `true_history` is a view of it
+        self._true_buf = np.empty(128, dtype=np.float64)
+        self._true_buf[0] = self.true_price
         self.tick = 0
         self._order_id = 0
 
+        self.log_every_n_ticks = max(1, int(log_every_n_ticks))
+        self._logger = _SnapshotLogger(log_path) if log_path is not None else None
+
+    @property
+    def trade_history(self) -> np.ndarray:
+        """Executed trades as a structured array with fields tick, price and size."""
+        return self._trades[:self._n_trades]
+
+    def _record_trade(self, price: float, size: float) -> None:
+        if self._n_trades == self._trades.size:
+            grown = np.empty(2 * self._trades.size, dtype=TRADE_DTYPE)
+            grown[:self._n_trades] = self._trades
+            self._trades = grown
+        self._trades[self._n_trades] = (self.tick, price, size)
+        self._n_trades += 1
+
+    def close(self) -> None:
+        """Flush and stop the LOB logger, if one is running."""
+        if self._logger is not None:
+            self._logger.close()
+            self._logger = None
+
+    def __enter__(self) -> MarketEngine:
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    @property
+    def order_book(self) -> List[Order]:
+        """All resting orders in arrival (`_id`) order.
+
+        This is a fresh list of the live orders; add or remove orders through the engine API.
+        """
+        return list(self.orders_by_id.values())
+
+    def best_bid(self) -> float | None:
+        """Highest resting bid price, or None if there are no bids."""
+        return -self.bids.peekitem(0)[0] if self.bids else None
+
+    def best_ask(self) -> float | None:
+        """Lowest resting ask price, or None if there are no asks."""
+        return self.asks.peekitem(0)[0] if self.asks else None
+
+    def best_level_size(self, side: str) -> float:
+        """Total size resting at the best price level of `side` (0.0 if that side is empty)."""
+        side = 'buy' if str(side) == 'buy' else 'sell'
+        best = self.best_bid() if side == 'buy' else self.best_ask()
+        return 0.0 if best is None else self.level_size[(side, best)]
+
+    @property
+    def best_bid_size(self) -> float:
+        """Total size resting at the best bid (0.0 if there are no bids)."""
+        return self.best_level_size('buy')
+
+    @property
+    def best_ask_size(self) -> float:
+        """Total size resting at the best ask (0.0 if there are no asks)."""
+        return self.best_level_size('sell')
+
+    @property
+    def true_history(self) -> np.ndarray:
+        """Latent price at every tick so far (index 0 is the initial price)."""
+        return self._true_buf[:self.tick + 1]
+
+    def _reserve_history(self, n_ticks: int) -> None:
+        """Make room in the price-path buffer for `n_ticks` more ticks."""
+        needed = self.tick + 1 + n_ticks
+        if needed > self._true_buf.size:
+            buf = np.empty(max(needed, 2 * self._true_buf.size), dtype=np.float64)
+            buf[:self.tick + 1] = self._true_buf[:self.tick + 1]
+            self._true_buf = buf
+
     def register_bot(self, bot: Any) -> None:
         self.bots.append(bot)
 
-    def place_order(self, order: Dict[str, Any]) -> None:
+    def _level(self, side: str, price: float) -> Deque[Order]:
+        """Return the deque for a price level, creating the level if needed."""
+        book, key = (self.bids, -price) if side == 'buy' else (self.asks, price)
+        level: Deque[Order] | None = book.get(key)
+        if level is None:
+            level = book[key] = deque()
+        return level
+
+    def _append(self, side: str, price: float, size: float, bot: Any, order_id: int) -> None:
+        """Build the order and append it to the tail of its price level, updating the indexes.
+
+        Raises ValueError unless `side` is 'buy' or 'sell'. The caller advances `_order_id` and
+        clears the level array cache.
+        """
+        if side not in SIGN:
+            raise ValueError(f"order side must be 'buy' or 'sell', got {side!r}")
+        o = Order(side, price, size, bot, order_id)
+        self._level(side, price).append(o)
+        self.orders_by_id[order_id] = o
+        lkey = (side, price)
+        self.level_size[lkey] = self.level_size.get(lkey, 0.0) + size
+
+    def _pop_head(self, book: SortedDict, key: float, level: Deque[Order]) -> None:
+        """Remove the (fully filled) head order of `level`, dropping the level once empty."""
+        o = level.popleft()
+        del self.orders_by_id[o._id]
+        if not level:
+            del book[key]
+            del self.level_size[('buy' if book is self.bids else 'sell', o.price)]
+
+    def place_order(self, order: Mapping[str, Any]) -> None:
         """Add an order to the book. Orders are expected to contain 'side','price','size','bot'.
-        This method does not run the matcher; call `_match_orders()` or `step()` to match."""
-        o = dict(order)
-        o['price'] = float(o['price'])
-        o['size'] = float(o['size'])
-        o['side'] = str(o['side'])
-        o['_id'] = self._order_id
+        This method does not run the matcher; call `_match_orders()` or `step()` to match.
+        Raises ValueError if 'side' is not 'buy' or 'sell'."""
+        self._append(str(order['side']), float(order['price']), float(order['size']), order.get('bot'), self._order_id)
         self._order_id += 1
-        self.order_book.append(o)
+        self._levels_cache.clear()
+
+    def place_orders(self, orders: Iterable[Any]) -> None:
+        """Add each order in `orders` as `place_order` would, in iteration order.
+
+        Orders are dicts as for `place_order`, or namedtuples with `side`, `price`, `size`
+        (and optionally `bot`) fields, which are read by attribute. Each order is appended to its
+        price level's queue, so nothing is re-sorted; the level array cache is cleared once for
+        the whole batch.
+        """
+        order_id = self._order_id
+        try:
+            for order in orders:
+                if hasattr(order, '_fields'):  # namedtuple
+                    side = str(order.side)
+                    price = float(order.price)
+                    size = float(order.size)
+                    bot = getattr(order, 'bot', None)
+                else:
+                    side = str(order['side'])
+                    price = float(order['price'])
+                    size = float(order['size'])
+                    bot = order.get('bot')
+                self._append(side, price, size, bot, order_id)
+                order_id += 1
+        finally:
+            # orders before a rejected one stay placed, as with `place_order` in a loop
+            self._order_id = order_id
+            self._levels_cache.clear()
+
+    def place_orders_batch(self, sides: Sequence[str], prices: Sequence[float] | np.ndarray,
+                           sizes: Sequence[float] | np.ndarray, bot: Any = None, *,
+                           bots: Sequence[Any] | None = None) -> None:
+        """Add many orders in one call, equivalent to `place_order` on each row in turn.
+
+        `sides`, `prices` and `sizes` are parallel sequences (lists or NumPy arrays). Every order
+        is attributed to `bot`, unless `bots` gives a per-row owner as a fourth parallel sequence.
+        The orders receive a contiguous block of `_id`s in row order.
+        """
+        sides = [str(x) for x in sides]
+        prices = np.asarray(prices, dtype=np.float64).tolist()
+        sizes = np.asarray(sizes, dtype=np.float64).tolist()
+        owners = [bot] * len(sides) if bots is None else list(bots)
+        if not len(sides) == len(prices) == len(sizes) == len(owners):
+            raise ValueError("sides, prices, sizes and bots must have the same length")
+
+        order_id = self._order_id
+        try:
+            for side, price, size, owner in zip(sides, prices, sizes, owners):
+                self._append(side, price, size, owner, order_id)
+                order_id += 1
+        finally:
+            self._order_id = order_id
+            self._levels_cache.clear()
 
     def step(self) -> None:
         """Advance one tick: update true price, let bots post orders, then match."""
-        self.tick += 1
         # simple random-walk for the latent price
-        self.true_price += float(self.rng.normal(0, self.vol))
-        self.true_history.append(self.true_price)
+        self._tick_at(self.true_price + float(self.rng.normal(0, self.vol)))
+
+    def run(self, n_ticks: int) -> None:
+        """Advance `n_ticks` ticks like calling `step()` repeatedly.
+
+        The whole random-walk path is drawn from `rng` in one call up front, so with a seeded
+        generator shared with bots the resulting path differs from a `step()` loop.
+        """
+        n = int(n_ticks)
+        if n <= 0:
+            return
+        path = np.cumsum(np.concatenate(([self.true_price], self.rng.normal(0, self.vol, n))))
+        self._reserve_history(n)
+        for price in path[1:].tolist():
+            self._tick_at(price)
+
+    def _tick_at(self, price: float) -> None:
+        """Run one tick at latent price `price` (`_step_core`), then log the book if due."""
+        self._step_core(price)
+        if self._logger is not None and self.tick % self.log_every_n_ticks == 0:
+            self._logger.submit((self.tick, self.true_price, self.level_arrays('buy'), self.level_arrays('sell')))
+
+    def _step_core(self, price: float) -> None:
+        """The state update of one tick: record latent price `price`, run bots, then match."""
+        self.tick += 1
+        self.true_price = price
+        self._reserve_history(1)
+        self._true_buf[self.tick] = price
 
         for bot in list(self.bots):
             try:
@@ -59,17 +414,14 @@ class MarketEngine:
 
         self._match_orders()
 
-    def _sorted_book(self, side: str) -> List[Dict[str, Any]]:
-        """Return a list of orders for a side sorted by price/time priority.
+    def _sorted_book(self, side: str) -> Iterator[Order]:
+        """Yield the live orders for a side in price/time priority.
         - For 'buy': highest price first, earlier ids first
         - For 'sell': lowest price first, earlier ids first
         """
-        side = str(side)
-        side_orders = [o for o in self.order_book if o['side'] == side]
-        if side == 'buy':
-            return sorted(side_orders, key=lambda x: (-x['price'], x['_id']))
-        else:
-            return sorted(side_orders, key=lambda x: (x['price'], x['_id']))
+        book = self.bids if str(side) == 'buy' else self.asks
+        for level in book.values():
+            yield from level
 
     def _match_orders(self) -> None:
         """Match resting buys and sells using price/time priority.
@@ -77,28 +429,30 @@ class MarketEngine:
         When a buy.price >= sell.price we execute a trade. Trade price is the midpoint
         between the two order prices (to reflect an aggressive limit crossing behavior).
         """
-        while True:
-            buys = self._sorted_book('buy')
-            sells = self._sorted_book('sell')
-            if not buys or not sells:
+        bids, asks = self.bids, self.asks
+        while bids and asks:
+            bid_key, bid_level = bids.peekitem(0)
+            ask_key, ask_level = asks.peekitem(0)
+            if -bid_key < ask_key:
                 break
-            best_buy = buys[0]
-            best_sell = sells[0]
-            if best_buy['price'] < best_sell['price']:
-                break
-
-            trade_size = min(best_buy['size'], best_sell['size'])
-            trade_price = 0.5 * (best_buy['price'] + best_sell['price'])
+            best_buy = bid_level[0]
+            best_sell = ask_level[0]
 
-            # record trade
-            trade = {'price': float(trade_price), 'size': float(trade_size), 'tick': self.tick}
-            self.trade_history.append(trade)
+            trade_size = min(best_buy.size, best_sell.size)
+            trade_price = 0.5 * (best_buy.price + best_sell.price)
 
-            # reduce sizes and purge zero-sized orders
-            best_buy['size'] -= trade_size
-            best_sell['size'] -= trade_size
+            self._record_trade(trade_price, trade_size)
 
-            self.order_book = [o for o in self.order_book if o['size'] > 0]
+            # reduce sizes and pop filled orders off the head of their level
+            best_buy.size -= trade_size
+            best_sell.size -= trade_size
+            self.level_size[('buy', best_buy.price)] -= trade_size
+            self.level_size[('sell', best_sell.price)] -= trade_size
+            if best_buy.size <= 0:
+                self._pop_head(bids, bid_key, bid_level)
+            if best_sell.size <= 0:
+                self._pop_head(asks, ask_key, ask_level)
+        self._levels_cache.clear()
 
     def execute_market_order(self, side: str, quantity: float) -> Dict[str, Any]:
         """Execute a market sweep without adding an order to the book.
@@ -111,111 +465,146 @@ class MarketEngine:
         total_cost = 0.0
         executed = 0.0
 
-        # passive side
+        # passive side: consume from the head of the best level
+        book = self.asks if side == 'buy' else self.bids
         passive_side = 'sell' if side == 'buy' else 'buy'
-        passive = self._sorted_book(passive_side)
 
-        for o in list(passive):
-            if qty_remaining <= 0:
-                break
-            take = min(qty_remaining, o['size'])
-            total_cost += take * o['price']
+        while qty_remaining > 0 and book:
+            key, level = book.peekitem(0)
+            o = level[0]
+            take = min(qty_remaining, o.size)
+            total_cost += take * o.price
             qty_remaining -= take
             executed += take
-            # mutate the real book to remove consumed quantity
-            # find the order in self.order_book by id and reduce/remove
-            for real in self.order_book:
-                if real['_id'] == o['_id']:
-                    real['size'] -= take
-                    break
-
-        # purge zero-sized orders
-        self.order_book = [o for o in self.order_book if o['size'] > 0]
+            o.size -= take
+            self.level_size[(passive_side, o.price)] -= take
+            if o.size <= 0:
+                self._pop_head(book, key, level)
+        self._levels_cache.clear()
 
         vwap = (total_cost / executed) if executed > 0 else None
         return {'executed_size': executed, 'unfilled_size': float(quantity) - executed, 'vwap': vwap}
 
-    def load_snapshot(self, snapshot: list[Dict[str, Any]]) -> None:
+    def load_snapshot(self, snapshot: Iterable[Any]) -> None:
         """Replace the current order book with the provided snapshot.
 
-        Each order in `snapshot` should be a dict with at least `side`, `price`, and `size`.
+        Each order in `snapshot` should be a dict (or namedtuple, see `place_orders`) with at
+        least `side`, `price`, and `size`.
         This method assigns internal `_id` values so the engine can reference orders.
+        The snapshot is not modified: each entry is copied into a new `Order`.
         """
-        self.order_book = []
-        for o in snapshot:
-            new = dict(o)
-            new['price'] = float(new['price'])
-            new['size'] = float(new['size'])
-            new['side'] = str(new['side'])
-            new['bot'] = new.get('bot', None)
-            new['_id'] = self._order_id
-            self._order_id += 1
-            self.order_book.append(new)
-
-    def simulate_market_order(self, side: str, quantity: float, book: list[Dict[str, Any]] | None = None) -> Dict[str, Any]:
+        self.bids.clear()
+        self.asks.clear()
+        self.orders_by_id.clear()
+        self.level_size.clear()
+        self._levels_cache.clear()
+        self.place_orders(snapshot)
+
+    def simulate_market_order(self, side: str, quantity: float, book: Sequence[Mapping[str, Any]] | None = None) -> Dict[str, Any]:
         """Simulate a market sweep on a copy of the provided `book` (or current book)
         and return a dict like `execute_market_order` plus the simulated resulting book
-        (a list of orders with reduced sizes). This method does not mutate engine state.
+        (a list of order dicts with reduced sizes). This method does not mutate engine state.
+
+        With an explicit `book`, only the orders the sweep reaches are copied; the rest are
+        returned as the same objects, so treat the resulting book as read-only.
         """
         side = str(side)
         qty_remaining = float(quantity)
         total_cost = 0.0
         executed = 0.0
 
+        passive_side = 'sell' if side == 'buy' else 'buy'
+
         if book is None:
-            # work on a deep-ish copy of the current book
-            sim_book = [dict(o) for o in self.order_book]
-        else:
-            sim_book = [dict(o) for o in book]
+            # walk the live level index without mutating it, then copy with reduced sizes
+            taken: Dict[int, float] = {}
+            for resting in self._sorted_book(passive_side):
+                if qty_remaining <= 0:
+                    break
+                take = min(qty_remaining, resting.size)
+                total_cost += take * resting.price
+                qty_remaining -= take
+                executed += take
+                taken[resting._id] = take
+            sim_book = [resting.to_dict() for resting in self.orders_by_id.values()]
+            for o in sim_book:
+                o['size'] -= taken.get(o['_id'], 0.0)
+            sim_book = [o for o in sim_book if o['size'] > 0]
+            vwap = (total_cost / executed) if executed > 0 else None
+            return {'executed_size': executed, 'unfilled_size': float(quantity) - executed, 'vwap': vwap, 'book': sim_book}
 
-        passive_side = 'sell' if side == 'buy' else 'buy'
         # select passive orders sorted by price/time priority
-        passive = [o for o in sim_book if o['side'] == passive_side]
-        if passive_side == 'sell':
-            passive = sorted(passive, key=lambda x: (x['price'], x['_id']))
-        else:
-            passive = sorted(passive, key=lambda x: (-x['price'], x['_id']))
+        passive_sign = SIGN[passive_side]
+        passive = sorted((i for i, o in enumerate(book) if o['side'] == passive_side),
+                         key=lambda i: (-passive_sign * book[i]['price'], book[i]['_id']))
 
-        for o in passive:
+        # remaining size of each order the sweep touches, by position in `book`
+        reduced: Dict[int, float] = {}
+        for i in passive:
             if qty_remaining <= 0:
                 break
-            take = min(qty_remaining, o['size'])
-            total_cost += take * o['price']
+            order = book[i]
+            take = min(qty_remaining, order['size'])
+            total_cost += take * order['price']
             qty_remaining -= take
             executed += take
-            # reduce in the sim_book by id
-            for real in sim_book:
-                if real['_id'] == o['_id']:
-                    real['size'] -= take
-                    break
+            reduced[i] = order['size'] - take
 
-        # remove zero-sized
-        sim_book = [o for o in sim_book if o['size'] > 0]
+        # copy only the reduced orders and drop the ones filled to zero
+        result = [order if i not in reduced else dict(order, size=reduced[i])
+                  for i, order in enumerate(book) if reduced.get(i, order['size']) > 0]
         vwap = (total_cost / executed) if executed > 0 else None
-        return {'executed_size': executed, 'unfilled_size': float(quantity) - executed, 'vwap': vwap, 'book': sim_book}
+        return {'executed_size': executed, 'unfilled_size': float(quantity) - executed, 'vwap': vwap, 'book': result}
+
+    def level_arrays(self, side: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Return `(prices, sizes)` float64 arrays for a side's price levels, best level first.
+
+        The arrays are cached until the book next changes and are marked read-only; copy
+        them before mutating.
+        """
+        side = 'buy' if str(side) == 'buy' else 'sell'
+        cached = self._levels_cache.get(side)
+        if cached is not None:
+            return cached
+        book = self.bids if side == 'buy' else self.asks
+        n = len(book)
+        prices = np.fromiter(book.keys(), dtype=np.float64, count=n)
+        if side == 'buy':
+            prices = -prices
+        sizes = np.fromiter((self.level_size[(side, p)] for p in prices.tolist()), dtype=np.float64, count=n)
+        prices.setflags(write=False)
+        sizes.setflags(write=False)
+        self._levels_cache[side] = (prices, sizes)
+        return prices, sizes
 
     def get_cumulative_depth(self) -> pd.DataFrame:
-        """Return a DataFrame with columns: side, price, cum_size"""
-        if not self.order_book:
-            return pd.DataFrame(columns=['side', 'price', 'cum_size'])
+        """Return a DataFrame with columns: side, price, cum_size
 
-        df = pd.DataFrame(self.order_book)
-        out = []
+        Bids come first (best/highest price first), then asks (best/lowest price first).
+        Level sizes are already aggregated by the level index, so this is one cumsum per side.
+        """
+        sides, prices, cums = [], [], []
         for side in ('buy', 'sell'):
-            s = df[df['side'] == side]
-            if s.empty:
+            p, sz = self.level_arrays(side)
+            if p.size == 0:
                 continue
-            grouped = s.groupby('price', as_index=False)['size'].sum()
-            if side == 'buy':
-                grouped = grouped.sort_values('price', ascending=False)
-                grouped['cum_size'] = grouped['size'].cumsum()
-            else:
-                grouped = grouped.sort_values('price', ascending=True)
-                grouped['cum_size'] = grouped['size'].cumsum()
-            grouped['side'] = side
-            out.append(grouped[['side', 'price', 'cum_size']])
-
-        return pd.concat(out, ignore_index=True) if out else pd.DataFrame(columns=['side', 'price', 'cum_size'])
+            sides.append(np.full(p.size, side, dtype=object))
+            prices.append(p)
+            cums.append(np.cumsum(sz))
+        if not prices:
+            return pd.DataFrame(columns=['side', 'price', 'cum_size'])
+        return pd.DataFrame({'side': np.concatenate(sides), 'price': np.concatenate(prices), 'cum_size': np.concatenate(cums)})
+
+    def get_cumulative_depth_arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Return `(bid_prices, bid_cum, ask_prices, ask_cum)` as float arrays.
+
+        Same data as `get_cumulative_depth` without the DataFrame: cumulative size is still
+        accumulated from the best level outwards, but both sides are ordered by ascending price
+        (so the best bid is `bid_prices[-1]` and the best ask `ask_prices[0]`), ready for plotting.
+        """
+        bid_prices, bid_sizes = self.level_arrays('buy')
+        ask_prices, ask_sizes = self.level_arrays('sell')
+        return bid_prices[::-1], np.cumsum(bid_sizes)[::-1], ask_prices, np.cumsum(ask_sizes)
 
     def calculate_price_impact(self, side: str, quantity: int) -> float:
         """Simulate a market order of size `quantity` and return slippage in bps.
@@ -223,48 +612,29 @@ class MarketEngine:
         Uses the current order book and does not mutate it. The mid-price is taken
         as (best_bid + best_ask) / 2. If either side is missing, returns 0.
         """
-        # find best bid and ask
-        bids = [o for o in self.order_book if o['side'] == 'buy']
-        asks = [o for o in self.order_book if o['side'] == 'sell']
-        best_bid = max([b['price'] for b in bids]) if bids else None
-        best_ask = min([a['price'] for a in asks]) if asks else None
+        best_bid = self.best_bid()
+        best_ask = self.best_ask()
         if best_bid is None or best_ask is None:
             return 0.0
 
         mid = 0.5 * (best_bid + best_ask)
 
-        qty_remaining = float(quantity)
-        total_cost = 0.0
-        filled = 0.0
+        # buy consumes asks from best (low) to worst; sell consumes bids from best (high)
+        prices, sizes = self.level_arrays('sell' if side == 'buy' else 'buy')
+        return price_impact(prices, sizes, mid, float(quantity), side == 'buy')
 
-        if side == 'buy':
-            # consume asks from best to worst
-            sims = sorted(asks, key=lambda x: (x['price'], x['_id']))
-            for o in sims:
-                if qty_remaining <= 0:
-                    break
-                take = min(qty_remaining, o['size'])
-                total_cost += take * o['price']
-                filled += take
-                qty_remaining -= take
-        else:
-            # sell: consume bids from best (high) to worst
-            sims = sorted(bids, key=lambda x: (-x['price'], x['_id']))
-            for o in sims:
-                if qty_remaining <= 0:
-                    break
-                take = min(qty_remaining, o['size'])
-                total_cost += take * o['price']
-                filled += take
-                qty_remaining -= take
+    def calculate_price_impact_curve(self, side: str, quantities: Sequence[float] | np.ndarray) -> np.ndarray:
+        """`calculate_price_impact` for each of `quantities`, computed in one pass over the book.
 
-        if filled == 0:
-            return 0.0
+        Returns a float array of slippage in bps (0 where nothing fills or the mid is undefined).
+        """
+        qty = np.asarray(quantities, dtype=np.float64)
+        best_bid = self.best_bid()
+        best_ask = self.best_ask()
+        if best_bid is None or best_ask is None:
+            return np.zeros_like(qty)
 
-        avg_exec_price = total_cost / filled
-        if side == 'buy':
-            impact_bps = (avg_exec_price / mid - 1.0) * 10000.0
-        else:
-            impact_bps = (1.0 - avg_exec_price / mid) * 10000.0
-        return float(impact_bps)
+        mid = 0.5 * (best_bid + best_ask)
+        prices, sizes = self.level_arrays('sell' if side == 'buy' else 'buy')
+        return price_impact_curve(prices, sizes, mid, qty, side == 'buy')
 
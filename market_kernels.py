@@ -0,0 +1,201 @@
+"""market_kernels.py — numeric kernels over per-level order book arrays
+
+The kernels take the `(prices, sizes)` level arrays produced by `MarketEngine.level_arrays`
+(best level first) and are compiled with Numba when it is installed. Numba is optional:
+without it the same functions run as plain Python, and `price_impact` and
+`price_impact_curve` fall back to vectorized NumPy implementations. Setting `NUMBA_DISABLE_JIT=1` runs the compiled kernels as
+plain Python too, which is handy for stepping through them in a debugger.
+
+Implements:
+- sweep: executed size and total cost of sweeping `qty` through the levels, consuming `sizes` in place
+- price_impact: slippage in bps of sweeping `qty` (non-mutating), the fill and the bps conversion in one call
+- fill_costs: executed size and total cost for a whole array of quantities in one vectorized pass
+- impact_curve: slippage in bps for an array of quantities, fused into one compiled loop
+- price_impact_curve: `impact_curve` with Numba, else the same curve from `fill_costs`
+- score_candidates: pick the order quantity with the lowest estimated execution price
+"""
+from __future__ import annotations
+from typing import Any, Tuple
+import numpy as np
+
+try:
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError:  # numba is optional
+    HAVE_NUMBA = False
+
+    def njit(*args: Any, **kwargs: Any) -> Any:  # type: ignore[no-redef]
+        if args and callable(args[0]):
+            return args[0]
+        return lambda f: f
+
+
+@njit(cache=True)
+def sweep(prices: np.ndarray, sizes: np.ndarray, qty: float) -> Tuple[float, float]:
+    """Consume up to `qty` from the levels in order, decrementing `sizes` in place.
+
+    Returns `(executed, total_cost)`.
+    """
+    executed = 0.0
+    total = 0.0
+    for i in range(prices.shape[0]):
+        if qty <= 0:
+            break
+        take = min(qty, sizes[i])
+        total += take * prices[i]
+        sizes[i] -= take
+        executed += take
+        qty -= take
+    return executed, total
+
+
+@njit(cache=True)
+def _fill_cost_nb(prices: np.ndarray, sizes: np.ndarray, qty: float) -> Tuple[float, float]:
+    executed = 0.0
+    total = 0.0
+    for i in range(prices.shape[0]):
+        if qty <= 0:
+            break
+        take = min(qty, sizes[i])
+        total += take * prices[i]
+        executed += take
+        qty -= take
+    return executed, total
+
+
+def _fill_cost_np(prices: np.ndarray, sizes: np.ndarray, qty: float) -> Tuple[float, float]:
+    if qty <= 0 or sizes.size == 0:
+        return 0.0, 0.0
+    # levels before `k` are taken in full and level `k` partially
+    cum = np.cumsum(sizes)
+    k = int(np.searchsorted(cum, qty, side='left'))
+    if k >= cum.size:
+        return float(cum[-1]), float(np.dot(prices, sizes))
+    taken = sizes[:k + 1].copy()
+    taken[k] = qty - (cum[k - 1] if k > 0 else 0.0)
+    return float(qty), float(np.dot(prices[:k + 1], taken))
+
+
+@njit(cache=True)
+def _bps(avg: Any, mid: float, is_buy: bool) -> Any:
+    """Slippage in bps of average execution price `avg` (a float or an array) against `mid`."""
+    return (avg / mid - 1.0) * 10000.0 if is_buy else (1.0 - avg / mid) * 10000.0
+
+
+@njit(cache=True)
+def _price_impact_nb(prices: np.ndarray, sizes: np.ndarray, mid: float, qty: float, is_buy: bool) -> float:
+    executed, total = _fill_cost_nb(prices, sizes, qty)
+    if executed <= 0:
+        return 0.0
+    bps: float = _bps(total / executed, mid, is_buy)
+    return bps
+
+
+@njit(cache=True)
+def _fill_at(prices: np.ndarray, cum_size: np.ndarray, cum_notional: np.ndarray, qty: float) -> Tuple[float, float]:
+    """`(executed, total_cost)` for `qty` > 0 from cumulative level size/notional, by binary search."""
+    n = prices.shape[0]
+    if n == 0:
+        return 0.0, 0.0
+    k = np.searchsorted(cum_size, qty)
+    if k >= n:
+        return cum_size[n - 1], cum_notional[n - 1]
+    prev_size = cum_size[k - 1] if k > 0 else 0.0
+    prev_notional = cum_notional[k - 1] if k > 0 else 0.0
+    return qty, prev_notional + prices[k] * (qty - prev_size)
+
+
+@njit(cache=True)
+def impact_curve(prices: np.ndarray, sizes: np.ndarray, mid: float, quantities: np.ndarray, is_buy: bool) -> np.ndarray:
+    """Slippage in bps against `mid` for sweeping each of `quantities` through the levels.
+
+    Matches `MarketEngine.calculate_price_impact` per quantity (0 where nothing fills) but
+    builds cumulative size and notional once and resolves every quantity in the same loop.
+    """
+    cum_size = np.cumsum(sizes)
+    cum_notional = np.cumsum(prices * sizes)
+    out = np.zeros(quantities.shape[0])
+    for j in range(quantities.shape[0]):
+        qty = quantities[j]
+        if qty <= 0:
+            continue
+        executed, total = _fill_at(prices, cum_size, cum_notional, qty)
+        if executed > 0:
+            out[j] = _bps(total / executed, mid, is_buy)
+    return out
+
+
+@njit(cache=True)
+def score_candidates(prices: np.ndarray, sizes: np.ndarray, mid: float, quantities: np.ndarray, is_buy: bool) -> int:
+    """Return the index of the quantity in `quantities` with the lowest estimated execution price.
+
+    The estimate is the one `MarketEngine.calculate_price_impact` implies: the VWAP of sweeping
+    the quantity through the levels, converted to bps against `mid` and back. Cumulative size and
+    notional are built once, then each candidate is resolved with a binary search. Quantities
+    <= 0 are skipped; returns -1 if none are positive. Ties keep the earliest candidate.
+    """
+    cum_size = np.cumsum(sizes)
+    cum_notional = np.cumsum(prices * sizes)
+    best = -1
+    best_price = np.inf
+    for j in range(quantities.shape[0]):
+        qty = quantities[j]
+        if qty <= 0:
+            continue
+        executed, total = _fill_at(prices, cum_size, cum_notional, qty)
+        bps = _bps(total / executed, mid, is_buy) if executed > 0 else 0.0
+        est_price = mid * (1.0 + bps / 10000.0) if is_buy else mid * (1.0 - bps / 10000.0)
+        if est_price < best_price:
+            best_price = est_price
+            best = j
+    return best
+
+
+def fill_costs(prices: np.ndarray, sizes: np.ndarray, quantities: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Return `(executed, total_cost)` arrays for sweeping each of `quantities` through the levels.
+
+    Cumulative size and notional are computed once; each quantity's fill boundary is then
+    found with one `searchsorted` over all quantities. Quantities <= 0 execute nothing.
+    """
+    qty = np.maximum(np.asarray(quantities, dtype=np.float64), 0.0)
+    n = prices.shape[0]
+    if n == 0:
+        return np.zeros_like(qty), np.zeros_like(qty)
+    cum_size = np.cumsum(sizes)
+    cum_notional = np.cumsum(prices * sizes)
+    # levels before `k` are taken in full and level `k` partially; k == n means the book runs out
+    k = np.searchsorted(cum_size, qty, side='left')
+    full = k >= n
+    kc = np.minimum(k, n - 1)
+    prev_size = np.where(kc > 0, cum_size[kc - 1], 0.0)
+    prev_notional = np.where(kc > 0, cum_notional[kc - 1], 0.0)
+    executed = np.where(full, cum_size[-1], qty)
+    total = np.where(full, cum_notional[-1], prev_notional + prices[kc] * (qty - prev_size))
+    return executed, total
+
+
+def price_impact(prices: np.ndarray, sizes: np.ndarray, mid: float, qty: float, is_buy: bool) -> float:
+    """Slippage in bps against `mid` for sweeping `qty` through the levels (0 if nothing fills)."""
+    if HAVE_NUMBA:
+        return float(_price_impact_nb(prices, sizes, float(mid), float(qty), is_buy))
+    executed, total = _fill_cost_np(prices, sizes, float(qty))
+    if executed <= 0:
+        return 0.0
+    return float(_bps(total / executed, mid, is_buy))
+
+
+def _impact_curve_np(prices: np.ndarray, sizes: np.ndarray, mid: float, quantities: np.ndarray, is_buy: bool) -> np.ndarray:
+    filled, total = fill_costs(prices, sizes, quantities)
+    # unfilled quantities price at the mid, i.e. 0 bps
+    avg = np.divide(total, filled, out=np.full_like(filled, mid), where=filled > 0)
+    curve: np.ndarray = _bps(avg, mid, is_buy)
+    return curve
+
+
+def price_impact_curve(prices: np.ndarray, sizes: np.ndarray, mid: float, quantities: np.ndarray, is_buy: bool) -> np.ndarray:
+    """Slippage in bps against `mid` for each of `quantities` (0 where nothing fills)."""
+    qty = np.asarray(quantities, dtype=np.float64)
+    if HAVE_NUMBA:
+        curve: np.ndarray = impact_curve(prices, sizes, float(mid), qty, is_buy)
+        return curve
+    return _impact_curve_np(prices, sizes, float(mid), qty, is_buy)
@@ -0,0 +1,85 @@
+"""multi_engine.py — one MarketEngine per symbol, advanced in parallel worker processes
+
+Price/time matching is serial within a symbol, so throughput scales across symbols: each
+engine (with its registered bots) is shipped to a process pool, advanced independently, and
+sent back. Engines share no state, so no locking is needed.
+
+Because engines round-trip through pickling, bots must be picklable and their updated state
+lives on the returned engines: read bots back from `multi.engines[symbol].bots` after a run
+rather than through references held before it.
+"""
+from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, Tuple
+import numpy as np
+
+from market_engine import MarketEngine
+
+
+def _run_engine(args: Tuple[MarketEngine, int]) -> MarketEngine:
+    engine, n_ticks = args
+    engine.run(n_ticks)
+    return engine
+
+
+class MultiEngine:
+    """Run a `MarketEngine` per symbol and dispatch ticks to a process pool.
+
+    Parameters
+    ----------
+    symbols: iterable[str]
+        Symbols to simulate; one engine is created for each
+    workers: int | None
+        Number of worker processes (None uses the CPU count). 0 advances the engines
+        in-process, which is handy for debugging and gives the same results.
+    init_price, vol: float
+        Passed to every `MarketEngine`
+    seed: int | None
+        Seeds an independent random stream per symbol
+    """
+
+    def __init__(self, symbols: Iterable[str], workers: int | None = None, *, init_price: float = 100.0,
+                 vol: float = 0.5, seed: int | None = None):
+        symbols = [str(s) for s in symbols]
+        seeds = np.random.SeedSequence(seed).spawn(len(symbols))
+        self.engines: Dict[str, MarketEngine] = {
+            s: MarketEngine(init_price=init_price, vol=vol, rng=np.random.default_rng(ss))
+            for s, ss in zip(symbols, seeds)
+        }
+        self.workers = workers
+        self._pool: ProcessPoolExecutor | None = None
+
+    def register_bot(self, symbol: str, bot: Any) -> None:
+        self.engines[symbol].register_bot(bot)
+
+    def step(self) -> None:
+        """Advance every engine one tick."""
+        self.run(1)
+
+    def run(self, n_ticks: int) -> None:
+        """Advance every engine `n_ticks` ticks.
+
+        Each engine makes a single round trip to a worker per call, so prefer one `run(n)`
+        over `n` calls to `step()` when bots do not need to be inspected between ticks.
+        """
+        symbols = list(self.engines)
+        jobs = [(self.engines[s], int(n_ticks)) for s in symbols]
+        if self.workers == 0:
+            results = [_run_engine(job) for job in jobs]
+        else:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            results = list(self._pool.map(_run_engine, jobs))
+        self.engines = dict(zip(symbols, results))
+
+    def close(self) -> None:
+        """Shut down the worker pool (it is recreated on the next run)."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self) -> MultiEngine:
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
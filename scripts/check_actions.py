@@ -1,17 +1,90 @@
 #!/usr/bin/env python3
 """Simple script to check the latest GitHub Actions run for this repo."""
 import json
+import re
 import sys
+from pathlib import Path
+from urllib.error import HTTPError
 from urllib.request import urlopen, Request
 
 OWNER = "aparnakumarishaw-stack"
 REPO = "MarketStimulator"
-URL = f"https://api.github.com/repos/{OWNER}/{REPO}/actions/runs"
+# we only print the 5 most recent runs
+URL = f"https://api.github.com/repos/{OWNER}/{REPO}/actions/runs?per_page=5"
+
+# conditional GET: the last ETag and body are cached so an unchanged run list costs a 304
+CACHE_DIR = Path.home() / ".cache"
+ETAG_PATH = CACHE_DIR / "marketstim_actions.etag"
+BODY_PATH = CACHE_DIR / "marketstim_actions.json"
+
+# url -> (etag, parsed json, Link header) for every conditional request made by this process
+_etag_cache = {}
+
+
+def get_json(url):
+    """GET `url` as JSON, revalidating with If-None-Match when an ETag is cached.
+
+    Returns `(data, headers, modified)`; on a 304 the cached data is returned with the 304's
+    headers and `modified=False`. A 304 need not repeat the `Link` header, so the cached one
+    is filled in to keep pagination working.
+    """
+    headers = {"User-Agent": "MarketStimulator-checker"}
+    cached = _etag_cache.get(url)
+    if cached:
+        headers["If-None-Match"] = cached[0]
+    try:
+        with urlopen(Request(url, headers=headers), timeout=10) as r:
+            data = json.load(r)
+            resp_headers = r.headers
+    except HTTPError as e:
+        if e.code == 304 and cached:
+            if cached[2] and not e.headers.get("Link"):
+                e.headers["Link"] = cached[2]
+            return cached[1], e.headers, False
+        raise
+    etag = resp_headers.get("ETag")
+    if etag:
+        _etag_cache[url] = (etag, data, resp_headers.get("Link"))
+    return data, resp_headers, True
+
+
+def next_page(headers):
+    """URL of the `rel="next"` page in a GitHub `Link` header, or None on the last page."""
+    m = re.search(r'<([^>]+)>;\s*rel="next"', headers.get("Link") or "")
+    return m.group(1) if m else None
+
+
+def poll_interval(headers, default=5):
+    """Seconds to wait before the next poll: at least `default`, or what the API asks for."""
+    wait = default
+    for name in ("X-Poll-Interval", "Retry-After"):
+        try:
+            wait = max(wait, int(headers.get(name, default)))
+        except (TypeError, ValueError):
+            pass
+    return wait
+
+
+def fetch_runs():
+    if ETAG_PATH.exists() and BODY_PATH.exists():
+        try:
+            _etag_cache[URL] = (ETAG_PATH.read_text().strip(), json.loads(BODY_PATH.read_bytes()), None)
+        except (OSError, ValueError):
+            pass  # unreadable cache: fetch unconditionally
+    data, _, _ = get_json(URL)
+    etag = _etag_cache.get(URL, (None,))[0]
+    if etag:
+        try:
+            CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            BODY_PATH.write_text(json.dumps(data))
+            ETAG_PATH.write_text(etag)
+        except OSError:
+            pass  # caching is best-effort
+    return data
+
 
-req = Request(URL, headers={"User-Agent": "MarketStimulator-checker"})
 try:
-    with urlopen(req, timeout=10) as r:
-        data = json.load(r)
+    data = fetch_runs()
 except Exception as e:
     print("Failed to fetch Actions runs:", e)
     sys.exit(2)
@@ -47,15 +120,17 @@ parser.add_argument('--wait', action='store_true', help='Poll until run complete
 args = parser.parse_args()
 
 def print_jobs(run_id):
-    jobs_url = f"https://api.github.com/repos/{OWNER}/{REPO}/actions/runs/{run_id}/jobs"
-    req = Request(jobs_url, headers={"User-Agent": "MarketStimulator-checker"})
+    # 100 per page covers nearly every run in one request; follow Link headers for the rest
+    jobs_url = f"https://api.github.com/repos/{OWNER}/{REPO}/actions/runs/{run_id}/jobs?per_page=100"
+    jobs = []
     try:
-        with urlopen(req, timeout=10) as jr:
-            jdata = json.load(jr)
+        while jobs_url:
+            jdata, jheaders, _ = get_json(jobs_url)
+            jobs.extend(jdata.get('jobs', []))
+            jobs_url = next_page(jheaders)
     except Exception as e:
         print('Failed to fetch job details:', e)
         return
-    jobs = jdata.get('jobs', [])
     if jobs:
         print('\nJobs for latest run:')
         for job in jobs:
@@ -66,13 +141,14 @@ def print_jobs(run_id):
 if run_id:
     print_jobs(run_id)
 
-    if args.wait:
-        # poll the run until it is completed
+    if args.wait and latest.get('status') != 'completed':
+        # poll the run until it is completed; the run list already gave us its current state,
+        # so wait before the first poll, and back off (up to 60s) while nothing changes
         run_url = f"https://api.github.com/repos/{OWNER}/{REPO}/actions/runs/{run_id}"
+        delay = 5
         while True:
-            req = Request(run_url, headers={"User-Agent": "MarketStimulator-checker"})
-            with urlopen(req, timeout=10) as rr:
-                rdata = json.load(rr)
+            time.sleep(delay)
+            rdata, rheaders, modified = get_json(run_url)
             status = rdata.get('status')
             conclusion = rdata.get('conclusion')
             print(f"Run status: {status}, conclusion: {conclusion}")
@@ -80,4 +156,5 @@ if run_id:
                 print('Run completed. Refreshing job details...')
                 print_jobs(run_id)
                 break
-            time.sleep(5)
+            base = poll_interval(rheaders)
+            delay = base if modified else min(60, max(base, 2 * delay))
@@ -1,9 +1,55 @@
 """Depth-snapshot-based simulation runner for evaluating execution strategies."""
 from __future__ import annotations
+import functools
+import inspect
 import json
-from typing import Any, Callable, Dict, List, Tuple
+from collections import namedtuple
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple
+import numpy as np
 from market_engine import MarketEngine
 
+try:
+    import ijson  # optional: parse snapshot files incrementally
+except ImportError:
+    ijson = None
+
+try:
+    import orjson  # optional: faster whole-file parsing
+except ImportError:
+    orjson = None
+
+
+# one resting order in a snapshot; immutable and lighter than a dict, read by attribute
+SnapshotOrder = namedtuple('SnapshotOrder', 'side price size bot', defaults=(None,))
+
+
+def _to_orders(snap: Iterable[Dict[str, Any]]) -> List[SnapshotOrder]:
+    return [SnapshotOrder(o['side'], o['price'], o['size'], o.get('bot')) for o in snap]
+
+
+def _load_json(path: str) -> Any:
+    """Parse a whole JSON file, with `orjson` when it is installed."""
+    if orjson is not None:
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def iter_snapshots(path: str) -> Iterator[List[SnapshotOrder]]:
+    """Yield the snapshots in a JSON snapshot file one at a time, as lists of `SnapshotOrder`.
+
+    With `ijson` installed the file is parsed incrementally, so only one snapshot is held in
+    memory; otherwise the whole file is parsed up front.
+    """
+    if ijson is None:
+        for snap in _load_json(path):
+            yield _to_orders(snap)
+        return
+    with open(path, 'rb') as f:
+        for snap in ijson.items(f, 'item', use_float=True):
+            yield _to_orders(snap)
+
 
 class SimulationRunner:
     """Run a simple snapshot-driven simulation.
@@ -13,15 +59,27 @@ class SimulationRunner:
         runner.run_strategy(MyBotClass(), side='buy', total_size=6.0)
 
     The runner returns a dict with executed, avg_price, total_cost, impact_bps (w.r.t snapshot mid)
+    Exceptions raised by the bot propagate to the caller.
+
+    Each snapshot is a list of `SnapshotOrder`s, as produced by `iter_snapshots` and
+    `load_snapshot_file`, or a list of order dicts as `json.load` returns them.
+
+    `snapshots` may be any iterable, e.g. `iter_snapshots(path)`; a one-shot iterator supports a
+    single `run_strategy` call, so pass a list to compare several strategies on the same data.
     """
 
-    def __init__(self, snapshots: List[List[Dict[str, Any]]]):
+    def __init__(self, snapshots: Iterable[List[SnapshotOrder] | List[Dict[str, Any]]]):
         self.snapshots = snapshots
 
     @staticmethod
-    def load_snapshot_file(path: str) -> List[List[Dict[str, Any]]]:
-        with open(path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+    @functools.lru_cache(maxsize=None)
+    def load_snapshot_file(path: str) -> List[List[SnapshotOrder]]:
+        """Parse a snapshot file into a list, once per path per process.
+
+        The cached list is shared between callers, so treat it as read-only (the runner and
+        `MarketEngine.load_snapshot` only read it). Use `iter_snapshots` to re-read a file.
+        """
+        return [_to_orders(snap) for snap in _load_json(path)]
 
     def run_strategy(self, bot_factory: Callable[[], Any], *, side: str = 'buy', total_size: float = 6.0, max_ticks: int | None = None) -> Dict[str, Any]:
         engine = MarketEngine(init_price=100.0, vol=0.0, rng=None)
@@ -29,46 +87,49 @@ class SimulationRunner:
         # Give bot a chance to be registered if needed
         engine.register_bot(bot)
 
-        # Start the execution on the bot; accommodate differing start_order signatures
-        try:
-            bot.start_order(side=side, total_size=total_size)
-        except TypeError:
+        # Start the execution on the bot; accommodate differing start_order signatures, checked
+        # once up front (a bot without start_order may act without an explicit start)
+        start_order = getattr(bot, 'start_order', None)
+        if start_order is not None:
             try:
-                bot.start_order(side, total_size, slices=int(total_size))
-            except Exception:
-                # if bot has no start_order, continue (it may act without explicit start)
-                pass
+                inspect.signature(start_order).bind(side=side, total_size=total_size)
+            except TypeError:  # e.g. `slices` is required
+                start_order(side, total_size, slices=int(total_size))
+            else:
+                start_order(side=side, total_size=total_size)
+
+        # Prefer calling the bot directly; bots without on_tick are driven through engine.step()
+        on_tick = getattr(bot, 'on_tick', None)
+        if on_tick is None:
+            def on_tick(engine: MarketEngine) -> None:
+                engine.step()
 
         remaining = float(total_size)
         executed_total = 0.0
         total_cost = 0.0
 
         ticks = 0
+        last_snap: List[Any] = []
         for snap in self.snapshots:
             if max_ticks is not None and ticks >= max_ticks:
                 break
             ticks += 1
+            last_snap = snap
             engine.load_snapshot(snap)
-            # Prefer calling the bot directly. If it fails, fall back to engine.step()
-            try:
-                bot.on_tick(engine)
-            except Exception:
-                try:
-                    engine.step()
-                except Exception:
-                    pass
+            on_tick(engine)
 
             # collect executions recorded by the bot
             if hasattr(bot, 'executions'):
-                # sum any new executions since last tick
-                for r in bot.executions:
-                    # executions may include partial fills; ensure we count
-                    executed = r.get('executed_size', 0.0)
-                    vwap = r.get('vwap', None)
-                    if executed > 0:
-                        executed_total += executed
-                        total_cost += (vwap or 0.0) * executed
-                        remaining = max(0.0, remaining - executed)
+                # sum any new executions since last tick; executions may include partial fills
+                execs = bot.executions
+                if execs:
+                    executed = np.fromiter((r.get('executed_size', 0.0) for r in execs), dtype=np.float64, count=len(execs))
+                    vwap = np.fromiter((r.get('vwap', None) or 0.0 for r in execs), dtype=np.float64, count=len(execs))
+                    filled = executed > 0
+                    tick_executed = float(executed[filled].sum())
+                    executed_total += tick_executed
+                    total_cost += float(np.dot(vwap[filled], executed[filled]))
+                    remaining = max(0.0, remaining - tick_executed)
                 # clear for next tick (store history only in runner if desired)
                 bot.executions = []
 
@@ -77,11 +138,19 @@ class SimulationRunner:
 
         avg_price = (total_cost / executed_total) if executed_total > 0 else None
 
-        # compute impact bps with respect to last snapshot mid
-        last_bids = [o for o in (self.snapshots[ticks-1] if ticks>0 else []) if o['side']=='buy']
-        last_asks = [o for o in (self.snapshots[ticks-1] if ticks>0 else []) if o['side']=='sell']
-        if last_bids and last_asks and avg_price is not None:
-            mid = 0.5 * (max(b['price'] for b in last_bids) + min(a['price'] for a in last_asks))
+        # compute impact bps with respect to last snapshot mid; best bid/ask in one pass, no lists
+        if last_snap and not isinstance(last_snap[0], SnapshotOrder):
+            last_snap = _to_orders(last_snap)
+        best_bid = best_ask = None
+        for o in last_snap:
+            p = o.price
+            if o.side == 'buy':
+                if best_bid is None or p > best_bid:
+                    best_bid = p
+            elif o.side == 'sell' and (best_ask is None or p < best_ask):
+                best_ask = p
+        mid = 0.5 * (best_bid + best_ask) if best_bid is not None and best_ask is not None else None
+        if mid is not None and avg_price is not None:
             impact_bps = (avg_price / mid - 1.0) * 10000.0 if side == 'buy' else (1.0 - avg_price / mid) * 10000.0
         else:
             impact_bps = None
@@ -91,8 +160,7 @@ class SimulationRunner:
 
 if __name__ == '__main__':
     # Quick smoke run using the sample file
-    snaps = SimulationRunner.load_snapshot_file('scripts/data/sample_depth_snapshots.json')
-    runner = SimulationRunner(snaps)
+    runner = SimulationRunner(iter_snapshots('scripts/data/sample_depth_snapshots.json'))
     from bots import SplittingBot
     res = runner.run_strategy(lambda: SplittingBot(), side='buy', total_size=6.0)
     print(res)
\ No newline at end of file
@@ -1,5 +1,6 @@
 from __future__ import annotations
 import os
+from concurrent.futures import ProcessPoolExecutor
 from scripts.depth_simulation import SimulationRunner
 from bots import SplittingBot, AdaptiveSplittingBot, GreedyAdaptiveBot, GreedyLookaheadBot
 
@@ -8,29 +9,59 @@ ARTIFACTS = os.path.abspath('artifacts')
 os.makedirs(ARTIFACTS, exist_ok=True)
 
 
-def main(save_csv: str | None = None):
-    snaps = SimulationRunner.load_snapshot_file(SNAP_PATH)
-    runner = SimulationRunner(snaps)
+# bot factories are module-level functions (not lambdas) so they can be sent to worker processes
+def make_splitting():
+    return SplittingBot()
+
+
+def make_adaptive():
+    return AdaptiveSplittingBot(aggressiveness=0.5, min_slice=0.1, max_slice=2.0)
+
+
+def make_greedy():
+    return GreedyAdaptiveBot()
+
+
+def make_lookahead():
+    return GreedyLookaheadBot(horizon=3, mm_assume_size=1.0)
 
-    strategies = [
-        ('splitting', lambda: SplittingBot()),
-        ('adaptive', lambda: AdaptiveSplittingBot(aggressiveness=0.5, min_slice=0.1, max_slice=2.0)),
-        ('greedy', lambda: GreedyAdaptiveBot()),
-        ('lookahead', lambda: GreedyLookaheadBot(horizon=3, mm_assume_size=1.0)),
-    ]
 
-    results = []
-    for name, fact in strategies:
-        res = runner.run_strategy(fact, side='buy', total_size=6.0)
-        results.append({'strategy': name, **res})
+STRATEGIES = [
+    ('splitting', make_splitting),
+    ('adaptive', make_adaptive),
+    ('greedy', make_greedy),
+    ('lookahead', make_lookahead),
+]
+
+
+def _run_one(job):
+    name, factory, snaps = job
+    res = SimulationRunner(snaps).run_strategy(factory, side='buy', total_size=6.0)
+    return {'strategy': name, **res}
+
+
+def main(save_csv: str | None = None, workers: int | None = None):
+    """Run every strategy on the sample snapshots and write a CSV of the results.
+
+    Strategies are independent, so they run in a process pool (`workers` processes, None for
+    the CPU count); `workers=0` runs them in-process. Rows keep the `STRATEGIES` order.
+    """
+    snaps = SimulationRunner.load_snapshot_file(SNAP_PATH)
+    jobs = [(name, factory, snaps) for name, factory in STRATEGIES]
+
+    if workers == 0:
+        results = [_run_one(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_run_one, jobs))
 
     csv_path = save_csv or os.path.join(ARTIFACTS, 'depth_sim_results.csv')
     import csv
-    with open(csv_path, 'w', newline='') as f:
+    columns = ['strategy', 'executed', 'avg_price', 'impact_bps', 'remaining']
+    with open(csv_path, 'w', newline='', buffering=1 << 16) as f:
         w = csv.writer(f)
-        w.writerow(['strategy', 'executed', 'avg_price', 'impact_bps', 'remaining'])
-        for r in results:
-            w.writerow([r['strategy'], r['executed'], r['avg_price'], r['impact_bps'], r['remaining']])
+        w.writerow(columns)
+        w.writerows([tuple(r[c] for c in columns) for r in results])
 
     print('Saved results to', csv_path)
     return csv_path
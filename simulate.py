@@ -5,18 +5,49 @@ latent true price and executed trades.
 """
 from __future__ import annotations
 import os
+from typing import BinaryIO
 import numpy as np
 import matplotlib
 # Use Agg backend for headless environments (tests/CI)
 matplotlib.use('Agg')
 import matplotlib.pyplot as plt
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
 from market_engine import MarketEngine
 from bots import MarketMaker
 
 OUTPUT_PATH = "market_simulation.png"
 
+# one figure per plot function, cleared and redrawn on each call: creating a figure costs far
+# more than clearing one when scripts render many charts. The figures are not registered with
+# pyplot (they draw on their own Agg canvas), so they never linger in `plt.get_fignums()` or
+# pop up in a later `plt.show()`.
+_FIGURES: dict = {}
 
-def run_simulation(ticks: int = 100, seed: int | None = 1, savepath: str = OUTPUT_PATH) -> str:
+
+def _reuse_figure(name: str, figsize: tuple):
+    """Return `(fig, ax, fresh)` for plot `name` with a cleared axes; `fresh` marks a new figure.
+
+    The layout is computed once (`tight_layout` on a fresh figure) and reused afterwards.
+    """
+    entry = _FIGURES.get(name)
+    if entry is not None:
+        fig, ax = entry
+        ax.cla()
+        return fig, ax, False
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    _FIGURES[name] = (fig, ax)
+    return fig, ax, True
+
+
+def run_simulation(ticks: int = 100, seed: int | None = 1, savepath: str | BinaryIO = OUTPUT_PATH) -> str | BinaryIO:
+    """Run the simulation and save its plot to `savepath`.
+
+    `savepath` may be a path (the absolute path is returned) or a binary file-like object,
+    which receives the PNG bytes and is returned as-is.
+    """
     rng = np.random.default_rng(seed)
 
     engine = MarketEngine(init_price=100.0, vol=0.5, rng=rng)
@@ -27,17 +58,16 @@ def run_simulation(ticks: int = 100, seed: int | None = 1, savepath: str = OUTPU
     engine.register_bot(mm1)
     engine.register_bot(mm2)
 
-    for _ in range(ticks):
-        engine.step()
+    engine.run(ticks)
 
     # Gather trade prices and ticks
-    trade_prices = [t["price"] for t in engine.trade_history]
-    trade_ticks = [t["tick"] for t in engine.trade_history]
+    trade_prices = engine.trade_history["price"]
+    trade_ticks = engine.trade_history["tick"]
 
     # Plotting
-    fig, ax = plt.subplots(figsize=(10, 5))
+    fig, ax, fresh = _reuse_figure("simulation", (10, 5))
     ax.plot(engine.true_history, label="True Price", lw=1.5)
-    if trade_prices:
+    if trade_prices.size:
         ax.scatter(trade_ticks, trade_prices, color="red", s=10, alpha=0.7, label="Trades")
 
     ax.set_xlabel("Tick")
@@ -46,9 +76,12 @@ def run_simulation(ticks: int = 100, seed: int | None = 1, savepath: str = OUTPU
     ax.legend()
     ax.grid(True, alpha=0.2)
 
-    plt.tight_layout()
-    plt.savefig(savepath)
-    plt.close(fig)
+    if fresh:
+        fig.tight_layout()
+    if not isinstance(savepath, (str, os.PathLike)):
+        fig.savefig(savepath, dpi=100, format="png")
+        return savepath
+    fig.savefig(savepath, dpi=100)
 
     print(f"Saved simulation plot to: {os.path.abspath(savepath)}")
     return os.path.abspath(savepath)
@@ -69,21 +102,19 @@ def plot_depth(engine: 'MarketEngine', savepath: str = "market_depth.png", *, ho
     except Exception:
         sns = None
 
-    df = engine.get_cumulative_depth()
-
-    bids = df[df["side"] == "buy"].sort_values("price", ascending=True)
-    asks = df[df["side"] == "sell"].sort_values("price", ascending=True)
+    # both sides ordered by ascending price
+    bid_prices, bid_cum, ask_prices, ask_cum = engine.get_cumulative_depth_arrays()
 
-    fig, ax = plt.subplots(figsize=(10, 5))
+    fig, ax, fresh = _reuse_figure("depth", (10, 5))
 
-    if not asks.empty:
-        ax.step(asks["price"], asks["cum_size"], where="post", label="Asks (sell)", color="red")
-    if not bids.empty:
-        ax.step(bids["price"], bids["cum_size"], where="post", label="Bids (buy)", color="green")
+    if ask_prices.size:
+        ax.step(ask_prices, ask_cum, where="post", label="Asks (sell)", color="red")
+    if bid_prices.size:
+        ax.step(bid_prices, bid_cum, where="post", label="Bids (buy)", color="green")
 
     # Shade spread between best bid and best ask (if both exist)
-    best_bid = bids["price"].max() if not bids.empty else None
-    best_ask = asks["price"].min() if not asks.empty else None
+    best_bid = float(bid_prices[-1]) if bid_prices.size else None
+    best_ask = float(ask_prices[0]) if ask_prices.size else None
     if best_bid is not None and best_ask is not None and best_bid < best_ask:
         ax.axvspan(best_bid, best_ask, color="gray", alpha=0.15)
         ax.text(0.5 * (best_bid + best_ask), ax.get_ylim()[1] * 0.95, f"Spread: {best_ask - best_bid:.4f}",
@@ -108,9 +139,9 @@ def plot_depth(engine: 'MarketEngine', savepath: str = "market_depth.png", *, ho
             # mplcursors optional
             pass
 
-    plt.tight_layout()
-    plt.savefig(savepath)
-    plt.close(fig)
+    if fresh:
+        fig.tight_layout()
+    fig.savefig(savepath, dpi=100)
 
     saved = os.path.abspath(savepath)
     print(f"Saved depth chart to: {saved}")
@@ -124,10 +155,10 @@ def plot_depth(engine: 'MarketEngine', savepath: str = "market_depth.png", *, ho
             ipath = interactive_path if interactive_path else os.path.splitext(savepath)[0] + ".html"
 
             figly = go.Figure()
-            if not asks.empty:
-                figly.add_trace(go.Scatter(x=asks["price"].tolist(), y=asks["cum_size"].tolist(), mode="lines", name="Asks", line_shape="hv", fill="tozeroy", line_color="red"))
-            if not bids.empty:
-                figly.add_trace(go.Scatter(x=bids["price"].tolist(), y=bids["cum_size"].tolist(), mode="lines", name="Bids", line_shape="hv", fill="tozeroy", line_color="green"))
+            if ask_prices.size:
+                figly.add_trace(go.Scatter(x=ask_prices.tolist(), y=ask_cum.tolist(), mode="lines", name="Asks", line_shape="hv", fill="tozeroy", line_color="red"))
+            if bid_prices.size:
+                figly.add_trace(go.Scatter(x=bid_prices.tolist(), y=bid_cum.tolist(), mode="lines", name="Bids", line_shape="hv", fill="tozeroy", line_color="green"))
 
             figly.update_layout(title="Cumulative Depth Chart (Interactive)", xaxis_title="Price", yaxis_title="Cumulative Size")
             figly.write_html(ipath, include_plotlyjs='cdn')
@@ -141,30 +172,31 @@ def plot_depth(engine: 'MarketEngine', savepath: str = "market_depth.png", *, ho
 def plot_price_impact_curve(engine: 'MarketEngine', savepath: str | None = None, *, max_size: int = 500, n_points: int = 20) -> None:
     """Plot expected slippage (bps) vs market order size for BUY orders.
 
-    Uses engine.calculate_price_impact for each tested size.
+    Uses engine.calculate_price_impact_curve to evaluate all tested sizes in one pass.
     """
-    import numpy as _np
-    import matplotlib.pyplot as _plt
-
-    order_sizes = _np.linspace(10, max_size, n_points)
-    impacts = []
-    for size in order_sizes:
-        bps = engine.calculate_price_impact('buy', int(size))
-        impacts.append(bps)
+    order_sizes = np.linspace(10, max_size, n_points)
+    # whole units, as with calculate_price_impact('buy', int(size))
+    impacts = engine.calculate_price_impact_curve('buy', np.trunc(order_sizes))
 
-    fig, ax = _plt.subplots(figsize=(10, 6))
+    if savepath:
+        fig, ax, fresh = _reuse_figure("price_impact", (10, 6))
+    else:
+        # shown interactively, so it has to be a pyplot figure
+        fig, ax = plt.subplots(figsize=(10, 6))
+        fresh = True
     ax.plot(order_sizes, impacts, marker='o', linestyle='-', color='purple')
     ax.set_title("Price Impact vs. Order Size")
     ax.set_xlabel("Market Order Size (Units)")
     ax.set_ylabel("Execution Cost (Basis Points)")
     ax.grid(True, alpha=0.3)
 
-    if savepath:
+    if fresh:
         fig.tight_layout()
-        fig.savefig(savepath)
+    if savepath:
+        fig.savefig(savepath, dpi=100)
         print(f"Saved price impact curve to: {savepath}")
     else:
-        _plt.show()
+        plt.show()
 
 
 if __name__ == "__main__":
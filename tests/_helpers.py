@@ -0,0 +1,17 @@
+"""Small helpers shared by the test modules."""
+from __future__ import annotations
+
+
+def avg_price(executions) -> float:
+    """Volume-weighted average price over a bot's `executions` records."""
+    total_executed = sum(r['executed_size'] for r in executions)
+    total_cost = sum((r['vwap'] or 0.0) * r['executed_size'] for r in executions)
+    return total_cost / total_executed
+
+
+def mid_of(engine, default: float = 100.0) -> float:
+    """Mid of the engine's best bid and ask, or `default` if either side is empty."""
+    best_bid, best_ask = engine.best_bid(), engine.best_ask()
+    if best_bid is None or best_ask is None:
+        return default
+    return 0.5 * (best_bid + best_ask)
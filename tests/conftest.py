@@ -0,0 +1,66 @@
+from __future__ import annotations
+import copy
+import os
+
+# pin the non-interactive backend before anything imports pyplot (also for subprocesses)
+os.environ.setdefault("MPLBACKEND", "Agg")
+import matplotlib
+matplotlib.use("Agg")
+
+import pytest
+
+# also loaded here so matplotlib and pyplot are imported once, at collection, rather than by
+# whichever test module happens to need them first
+import simulate  # noqa: F401
+from market_engine import MarketEngine
+from bots import MarketMaker
+from scripts.depth_simulation import SimulationRunner
+
+SAMPLE_SNAPSHOTS = 'scripts/data/sample_depth_snapshots.json'
+
+
+@pytest.fixture(scope='session')
+def engine_proto():
+    """An empty zero-vol `MarketEngine`, built once per session; take `fresh_engine` instead."""
+    return MarketEngine(init_price=100.0, vol=0.0, rng=None)
+
+
+@pytest.fixture
+def fresh_engine(engine_proto):
+    """A private deep copy of `engine_proto`, so tests can mutate it freely."""
+    return copy.deepcopy(engine_proto)
+
+
+@pytest.fixture(scope='session')
+def ask_ladder():
+    """The deep ask ladder shared by the strategy comparison tests: 105 x1, 106 x2, 107 x3.
+
+    `place_orders` copies each order into the engine, so tests can place these directly.
+    """
+    return [{'side': 'sell', 'price': p, 'size': s, 'bot': None} for p, s in [(105.0, 1.0), (106.0, 2.0), (107.0, 3.0)]]
+
+
+@pytest.fixture(scope='session')
+def sample_snapshots():
+    """The parsed sample depth snapshots, shared read-only across the session."""
+    return SimulationRunner.load_snapshot_file(SAMPLE_SNAPSHOTS)
+
+
+@pytest.fixture(scope='session')
+def mm_quote_stream():
+    """Per-tick quotes of a deterministic `MarketMaker(spread=1.0, size=1.0, jitter=0.0)`.
+
+    Runs the maker for 12 ticks in an empty zero-vol engine and records the orders it posts
+    each tick. With `vol=0` and `jitter=0` its quotes do not depend on the book, so a test can
+    replay `engine.place_orders(mm_quote_stream[t])` before tick `t` instead of registering a
+    maker ahead of its other bots.
+    """
+    engine = MarketEngine(init_price=100.0, vol=0.0, rng=None)
+    engine.register_bot(MarketMaker(spread=1.0, size=1.0, jitter=0.0))
+    stream = []
+    for _ in range(12):
+        first_id = engine._order_id
+        engine.step()
+        stream.append([{'side': o.side, 'price': o.price, 'size': o.size, 'bot': o.bot}
+                       for o in engine.order_book if o._id >= first_id])
+    return stream
@@ -1,5 +1,5 @@
 from market_engine import MarketEngine
-from bots import NoiseTrader, InformedTrader
+from bots import NoiseTrader, InformedTrader, SplittingBot
 
 
 def test_noise_trader_posts_orders():
@@ -24,3 +24,21 @@ def test_informed_trader_sweeps():
 
     # given informed trader uses a very high buy price when buying, all sells should be consumed
     assert len(engine.trade_history) >= 2 or any(o['side'] == 'buy' for o in engine.order_book)
+
+
+def test_splitting_bot_execution_arrays_follow_records(fresh_engine):
+    engine = fresh_engine
+    engine.place_order({'side': 'sell', 'price': 101.0, 'size': 10.0, 'bot': None})
+    sb = SplittingBot()
+    engine.register_bot(sb)
+    sb.start_order('buy', total_size=20.0, slices=20)  # more slices than the initial buffer
+    engine.run(20)
+
+    sizes, vwaps = sb.executions_arrays()
+    assert sizes.tolist() == [r['executed_size'] for r in sb.executions]
+    assert vwaps.tolist() == [r['vwap'] or 0.0 for r in sb.executions]
+    assert sizes.sum() == 10.0
+
+    # clearing the records (as SimulationRunner does every tick) clears the columns too
+    sb.executions = []
+    assert sb.executions_arrays()[0].size == 0
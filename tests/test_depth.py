@@ -1,13 +1,16 @@
+import io
 from pathlib import Path
-from market_engine import MarketEngine
-from simulate import plot_depth
+import matplotlib.pyplot as plt
+from simulate import plot_depth, run_simulation
 
 
-def test_get_cumulative_depth_basic():
-    engine = MarketEngine(init_price=100.0, vol=0.0, rng=None)
-    engine.place_order({'side': 'buy', 'price': 100.0, 'size': 1.0, 'bot': None})
-    engine.place_order({'side': 'buy', 'price': 99.0, 'size': 2.0, 'bot': None})
-    engine.place_order({'side': 'sell', 'price': 101.0, 'size': 3.0, 'bot': None})
+def test_get_cumulative_depth_basic(fresh_engine):
+    engine = fresh_engine
+    engine.place_orders([
+        {'side': 'buy', 'price': 100.0, 'size': 1.0, 'bot': None},
+        {'side': 'buy', 'price': 99.0, 'size': 2.0, 'bot': None},
+        {'side': 'sell', 'price': 101.0, 'size': 3.0, 'bot': None},
+    ])
 
     df = engine.get_cumulative_depth()
 
@@ -17,13 +20,46 @@ def test_get_cumulative_depth_basic():
     asks = df[df['side'] == 'sell']
     assert list(asks['cum_size']) == [3.0]
 
+    bid_prices, bid_cum, ask_prices, ask_cum = engine.get_cumulative_depth_arrays()
+    assert bid_prices.tolist() == [99.0, 100.0] and bid_cum.tolist() == [3.0, 1.0]
+    assert ask_prices.tolist() == [101.0] and ask_cum.tolist() == [3.0]
 
-def test_plot_depth_creates_file(tmp_path: Path):
-    engine = MarketEngine(init_price=100.0, vol=0.0, rng=None)
-    engine.place_order({'side': 'buy', 'price': 100.0, 'size': 1.0, 'bot': None})
-    engine.place_order({'side': 'sell', 'price': 101.0, 'size': 1.0, 'bot': None})
+
+def test_plot_depth_creates_file(tmp_path: Path, fresh_engine):
+    engine = fresh_engine
+    engine.place_orders([
+        {'side': 'buy', 'price': 100.0, 'size': 1.0, 'bot': None},
+        {'side': 'sell', 'price': 101.0, 'size': 1.0, 'bot': None},
+    ])
 
     out = tmp_path / 'depth.png'
     path = plot_depth(engine, savepath=str(out))
     assert Path(path).exists()
     assert Path(path).stat().st_size > 0
+
+    # saved charts reuse private figures; nothing is left open in pyplot for a later show()
+    run_simulation(ticks=5, seed=1, savepath=io.BytesIO())
+    plot_depth(engine, savepath=str(out))
+    assert plt.get_fignums() == []
+
+
+def test_top_of_book_accessors_track_mutations(fresh_engine):
+    engine = fresh_engine
+    assert engine.best_bid() is None and engine.best_ask() is None
+    assert engine.best_bid_size == 0.0 and engine.best_ask_size == 0.0
+
+    engine.place_orders([
+        {'side': 'buy', 'price': 99.0, 'size': 2.0, 'bot': None},
+        {'side': 'buy', 'price': 99.0, 'size': 1.0, 'bot': None},
+        {'side': 'sell', 'price': 101.0, 'size': 3.0, 'bot': None},
+        {'side': 'sell', 'price': 102.0, 'size': 4.0, 'bot': None},
+    ])
+    assert engine.best_bid() == 99.0 and engine.best_bid_size == 3.0
+    assert engine.best_ask() == 101.0 and engine.best_ask_size == 3.0
+
+    # partially consume the best ask, then clear it and move to the next level
+    engine.execute_market_order('buy', 1.0)
+    assert engine.best_ask_size == 2.0
+    engine.execute_market_order('buy', 2.0)
+    assert engine.best_ask() == 102.0 and engine.best_ask_size == 4.0
+    assert ('sell', 101.0) not in engine.level_size
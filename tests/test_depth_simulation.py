@@ -1,12 +1,13 @@
 from __future__ import annotations
+import json
 
-from scripts.depth_simulation import SimulationRunner
-from bots import GreedyAdaptiveBot, GreedyLookaheadBot
+from scripts.depth_simulation import SimulationRunner, SnapshotOrder, iter_snapshots
+from market_engine import MarketEngine
+from bots import GreedyAdaptiveBot, GreedyLookaheadBot, SplittingBot
 
 
-def test_lookahead_vs_greedy_on_snapshots():
-    snaps = SimulationRunner.load_snapshot_file('scripts/data/sample_depth_snapshots.json')
-    runner = SimulationRunner(snaps)
+def test_lookahead_vs_greedy_on_snapshots(sample_snapshots):
+    runner = SimulationRunner(sample_snapshots)
 
     res_g = runner.run_strategy(lambda: GreedyAdaptiveBot(), side='buy', total_size=6.0)
     res_l = runner.run_strategy(lambda: GreedyLookaheadBot(horizon=3, mm_assume_size=1.0), side='buy', total_size=6.0)
@@ -17,4 +18,39 @@ def test_lookahead_vs_greedy_on_snapshots():
 
     # If impact is computable for both, lookahead should be at least as good
     if res_g['impact_bps'] is not None and res_l['impact_bps'] is not None:
-        assert res_l['impact_bps'] <= res_g['impact_bps'] + 1e-6
\ No newline at end of file
+        assert res_l['impact_bps'] <= res_g['impact_bps'] + 1e-6
+
+def test_runner_accepts_streamed_snapshots(sample_snapshots):
+    res_list = SimulationRunner(sample_snapshots).run_strategy(lambda: GreedyAdaptiveBot(), side='buy', total_size=6.0)
+    res_iter = SimulationRunner(iter_snapshots('scripts/data/sample_depth_snapshots.json')).run_strategy(lambda: GreedyAdaptiveBot(), side='buy', total_size=6.0)
+    assert res_iter == res_list
+
+
+def test_runner_accepts_dict_snapshots(sample_snapshots):
+    with open('scripts/data/sample_depth_snapshots.json', encoding='utf-8') as f:
+        raw = json.load(f)
+    res_dicts = SimulationRunner(raw).run_strategy(lambda: GreedyAdaptiveBot(), side='buy', total_size=6.0)
+    res_tuples = SimulationRunner(sample_snapshots).run_strategy(lambda: GreedyAdaptiveBot(), side='buy', total_size=6.0)
+    assert res_dicts == res_tuples and res_dicts['impact_bps'] is not None
+
+
+def test_snapshots_load_as_namedtuples(sample_snapshots):
+    snap = sample_snapshots[0]
+    assert all(isinstance(o, SnapshotOrder) for o in snap)
+
+    engine = MarketEngine(init_price=100.0, vol=0.0, rng=None)
+    engine.load_snapshot(snap)
+    assert [(o.side, o.price, o.size, o.bot) for o in engine.order_book] == [tuple(o) for o in snap]
+
+
+class _SlicesRequiredBot(SplittingBot):
+    def start_order(self, side, total_size, slices):
+        super().start_order(side, total_size, slices)
+
+
+def test_runner_passes_slices_when_start_order_requires_them(sample_snapshots):
+    bot = _SlicesRequiredBot()
+    res = SimulationRunner(sample_snapshots).run_strategy(lambda: bot, side='buy', total_size=6.0)
+    assert bot.slices == 6 and res['executed'] > 0
+    # the runner clears `executions` every tick; the column buffers follow it
+    assert len(bot.executions_arrays()[0]) == len(bot.executions)
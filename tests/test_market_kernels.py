@@ -0,0 +1,62 @@
+from __future__ import annotations
+import math
+
+import numpy as np
+
+from market_engine import MarketEngine
+from market_kernels import (_fill_cost_nb, _fill_cost_np, _price_impact_nb, fill_costs, price_impact,
+                            score_candidates, sweep)
+
+
+def test_fill_cost_implementations_agree():
+    prices = np.array([105.0, 106.0, 107.0])
+    sizes = np.array([1.0, 2.0, 3.0])
+    for qty in (0.0, 0.5, 1.0, 2.5, 6.0, 10.0):
+        a = _fill_cost_nb(prices, sizes, qty)
+        b = _fill_cost_np(prices, sizes, qty)
+        assert math.isclose(a[0], b[0]) and math.isclose(a[1], b[1])
+
+    quantities = np.array([-1.0, 0.0, 0.5, 1.0, 2.5, 6.0, 10.0])
+    executed, total = fill_costs(prices, sizes, quantities)
+    for q, e, t in zip(quantities, executed, total):
+        a = _fill_cost_np(prices, sizes, q)
+        assert math.isclose(e, a[0]) and math.isclose(t, a[1])
+    assert fill_costs(prices[:0], sizes[:0], quantities)[0].tolist() == [0.0] * 7
+
+    executed, total = _fill_cost_nb(prices, sizes, 10.0)
+    assert executed == 6.0
+    assert math.isclose(total, 105.0 * 1 + 106.0 * 2 + 107.0 * 3)
+
+
+def test_price_impact_matches_fill_cost():
+    prices = np.array([105.0, 106.0, 107.0])
+    sizes = np.array([1.0, 2.0, 3.0])
+    mid = 102.0
+    for qty in (0.0, 0.5, 2.5, 6.0, 10.0):
+        executed, total = _fill_cost_np(prices, sizes, qty)
+        expected = (total / executed / mid - 1.0) * 10000.0 if executed else 0.0
+        assert math.isclose(price_impact(prices, sizes, mid, qty, True), expected, abs_tol=1e-12)
+        assert math.isclose(_price_impact_nb(prices, sizes, mid, qty, False), -expected, abs_tol=1e-12)
+
+
+def test_sweep_consumes_sizes_in_place():
+    prices = np.array([105.0, 106.0, 107.0])
+    sizes = np.array([1.0, 2.0, 3.0])
+    executed, total = sweep(prices, sizes, 2.0)
+    assert executed == 2.0
+    assert math.isclose(total, 105.0 + 106.0)
+    assert list(sizes) == [0.0, 1.0, 3.0]
+
+
+def test_score_candidates_agrees_with_calculate_price_impact():
+    engine = MarketEngine(init_price=100.0, vol=0.0, rng=None)
+    engine.place_orders_batch(['buy', 'sell', 'sell', 'sell'], [99.0, 101.0, 102.0, 110.0], [1.0, 1.0, 2.0, 5.0])
+    mid = 0.5 * (99.0 + 101.0)
+
+    quantities = np.array([0.0, 6.0, 3.0, 1.0])
+    prices, sizes = engine.level_arrays('sell')
+    best = score_candidates(prices, sizes, mid, quantities, True)
+
+    est = [mid * (1.0 + engine.calculate_price_impact('buy', int(q)) / 10000.0) for q in quantities[1:]]
+    assert best == 1 + int(np.argmin(est))
+    assert score_candidates(prices, sizes, mid, np.zeros(3), True) == -1
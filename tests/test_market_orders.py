@@ -1,14 +1,18 @@
 from market_engine import MarketEngine
 import math
 
+import pytest
 
-def test_market_order_vwap_and_full_fill():
-    engine = MarketEngine(init_price=100.0, vol=0.0, rng=None)
+
+def test_market_order_vwap_and_full_fill(fresh_engine):
+    engine = fresh_engine
 
     # Place sells at 105 (1), 106 (2), 107 (3) -> total 6
-    engine.place_order({'side': 'sell', 'price': 105.0, 'size': 1.0, 'bot': None})
-    engine.place_order({'side': 'sell', 'price': 106.0, 'size': 2.0, 'bot': None})
-    engine.place_order({'side': 'sell', 'price': 107.0, 'size': 3.0, 'bot': None})
+    engine.place_orders([
+        {'side': 'sell', 'price': 105.0, 'size': 1.0, 'bot': None},
+        {'side': 'sell', 'price': 106.0, 'size': 2.0, 'bot': None},
+        {'side': 'sell', 'price': 107.0, 'size': 3.0, 'bot': None},
+    ])
 
     result = engine.execute_market_order('buy', 6.0)
 
@@ -23,11 +27,13 @@ def test_market_order_vwap_and_full_fill():
     assert all(o['side'] != 'sell' for o in engine.order_book)
 
 
-def test_market_order_insufficient_liquidity():
-    engine = MarketEngine(init_price=100.0, vol=0.0, rng=None)
+def test_market_order_insufficient_liquidity(fresh_engine):
+    engine = fresh_engine
 
-    engine.place_order({'side': 'sell', 'price': 105.0, 'size': 1.0, 'bot': None})
-    engine.place_order({'side': 'sell', 'price': 106.0, 'size': 1.0, 'bot': None})
+    engine.place_orders([
+        {'side': 'sell', 'price': 105.0, 'size': 1.0, 'bot': None},
+        {'side': 'sell', 'price': 106.0, 'size': 1.0, 'bot': None},
+    ])
 
     result = engine.execute_market_order('buy', 5.0)
 
@@ -38,11 +44,13 @@ def test_market_order_insufficient_liquidity():
     assert len(engine.order_book) == 0
 
 
-def test_sell_market_order_against_bids():
-    engine = MarketEngine(init_price=100.0, vol=0.0, rng=None)
+def test_sell_market_order_against_bids(fresh_engine):
+    engine = fresh_engine
 
-    engine.place_order({'side': 'buy', 'price': 99.0, 'size': 2.0, 'bot': None})
-    engine.place_order({'side': 'buy', 'price': 98.0, 'size': 2.0, 'bot': None})
+    engine.place_orders([
+        {'side': 'buy', 'price': 99.0, 'size': 2.0, 'bot': None},
+        {'side': 'buy', 'price': 98.0, 'size': 2.0, 'bot': None},
+    ])
 
     result = engine.execute_market_order('sell', 3.0)
 
@@ -50,4 +58,65 @@ def test_sell_market_order_against_bids():
     assert math.isclose(result['unfilled_size'], 0.0)
     # VWAP should be weighted by bid prices
     expected = (99.0*2 + 98.0*1) / 3.0
-    assert math.isclose(result['vwap'], expected)
\ No newline at end of file
+    assert math.isclose(result['vwap'], expected)
+
+def test_place_orders_batch_matches_individual_placement(fresh_engine):
+    engine = fresh_engine
+    engine.place_orders_batch(['sell', 'sell', 'buy', 'sell'], [105.0, 106.0, 99.0, 105.0], [1.0, 2.0, 1.5, 3.0], bot='nt')
+
+    assert [o['_id'] for o in engine.order_book] == [0, 1, 2, 3]
+    assert all(o['bot'] == 'nt' for o in engine.order_book)
+    assert engine.best_ask() == 105.0 and engine.best_ask_size == 4.0
+    assert engine.best_bid() == 99.0 and engine.best_bid_size == 1.5
+
+    # time priority inside the 105 level follows row order
+    result = engine.execute_market_order('buy', 2.0)
+    assert math.isclose(result['vwap'], 105.0)
+    remaining = [o for o in engine.order_book if o['price'] == 105.0]
+    assert len(remaining) == 1 and remaining[0]['_id'] == 3 and remaining[0]['size'] == 2.0
+
+    # per-row owners
+    engine.place_orders_batch(['buy', 'buy'], [98.0, 97.0], [1.0, 1.0], bots=['x', 'y'])
+    assert [o['bot'] for o in engine.order_book[-2:]] == ['x', 'y']
+    with pytest.raises(ValueError):
+        engine.place_orders_batch(['buy'], [98.0], [1.0], bots=['x', 'y'])
+
+
+def test_simulate_market_order_on_explicit_book_leaves_input_untouched():
+    book = [
+        {'side': 'sell', 'price': 101.0, 'size': 2.0, 'bot': None, '_id': 0},
+        {'side': 'sell', 'price': 100.0, 'size': 1.0, 'bot': None, '_id': 1},
+        {'side': 'buy', 'price': 99.0, 'size': 4.0, 'bot': None, '_id': 2},
+    ]
+    res = MarketEngine(init_price=100.0, vol=0.0, rng=None).simulate_market_order('buy', 2.0, book)
+
+    assert res['executed_size'] == 2.0 and res['vwap'] == 100.5
+    assert [(o['_id'], o['size']) for o in res['book']] == [(0, 1.0), (2, 4.0)]
+    assert [o['size'] for o in book] == [2.0, 1.0, 4.0]
+
+
+def test_place_orders_matches_place_order():
+    rows = [{'side': 'sell', 'price': 105, 'size': 1, 'bot': 'a'}, {'side': 'buy', 'price': 99.0, 'size': 2.0},
+            {'side': 'sell', 'price': 105.0, 'size': 3.0, 'bot': 'b'}]
+    one, bulk = MarketEngine(rng=None), MarketEngine(rng=None)
+    for o in rows:
+        one.place_order(o)
+    bulk.place_orders(iter(rows))
+
+    assert [dict(o) for o in bulk.order_book] == [dict(o) for o in one.order_book]
+    assert bulk.best_ask_size == 4.0 and bulk.level_arrays('sell')[1].tolist() == [4.0]
+
+
+def test_unknown_side_is_rejected(fresh_engine):
+    engine = fresh_engine
+    engine.place_order({'side': 'buy', 'price': 102.0, 'size': 1.0, 'bot': None})
+    with pytest.raises(ValueError):
+        engine.place_order({'side': 'Buy', 'price': 101.0, 'size': 1.0, 'bot': None})
+    with pytest.raises(ValueError):
+        engine.place_orders_batch(['sell', 'ask'], [103.0, 104.0], [1.0, 1.0])
+
+    # rows before the rejected one are placed with consecutive ids; nothing crossed
+    engine._match_orders()
+    assert len(engine.trade_history) == 0
+    assert [(o.side, o.price, o._id) for o in engine.order_book] == [('buy', 102.0, 0), ('sell', 103.0, 1)]
+    assert engine.best_ask() == 103.0
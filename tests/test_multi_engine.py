@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+import numpy as np
+
+from bots import MarketMaker
+from multi_engine import MultiEngine
+
+
+def _book(multi: MultiEngine, symbol: str):
+    return [(o['side'], o['price'], o['size']) for o in multi.engines[symbol].order_book]
+
+
+def test_parallel_run_matches_in_process_run():
+    symbols = ['AAA', 'BBB', 'CCC']
+    results = []
+    for workers in (0, 2):
+        with MultiEngine(symbols, workers=workers, vol=0.5, seed=11) as multi:
+            for s in symbols:
+                multi.register_bot(s, MarketMaker(spread=1.0, size=1.0, jitter=0.05, rng=np.random.default_rng(3)))
+            multi.run(5)
+            multi.step()
+            results.append(multi)
+
+    serial, parallel = results
+    for s in symbols:
+        assert parallel.engines[s].tick == 6
+        np.testing.assert_allclose(parallel.engines[s].true_history, serial.engines[s].true_history)
+        assert _book(parallel, s) == _book(serial, s)
+
+    # symbols get independent price paths
+    assert serial.engines['AAA'].true_price != serial.engines['BBB'].true_price
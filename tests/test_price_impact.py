@@ -1,24 +1,23 @@
 from __future__ import annotations
 import math
 
-from market_engine import MarketEngine
+import numpy as np
 
+from market_kernels import _impact_curve_np, impact_curve
 
-def test_price_impact_buy_full_book():
-    engine = MarketEngine(init_price=100.0, vol=0.0, rng=None)
 
-    # add a bid so mid can be computed
-    engine.place_order({'side': 'buy', 'price': 99.0, 'size': 1.0, 'bot': None})
+def test_price_impact_buy_full_book(fresh_engine):
+    engine = fresh_engine
 
-    # add asks at increasing prices and sizes: total size = 6
-    engine.place_order({'side': 'sell', 'price': 105.0, 'size': 1.0, 'bot': None})
-    engine.place_order({'side': 'sell', 'price': 106.0, 'size': 2.0, 'bot': None})
-    engine.place_order({'side': 'sell', 'price': 107.0, 'size': 3.0, 'bot': None})
+    # a bid so mid can be computed, then asks at increasing prices and sizes: total size = 6
+    prices = np.array([105.0, 106.0, 107.0])
+    sizes = np.array([1.0, 2.0, 3.0])
+    engine.place_order({'side': 'buy', 'price': 99.0, 'size': 1.0, 'bot': None})
+    engine.place_orders_batch(['sell'] * 3, prices, sizes)
 
     # compute expected VWAP and mid
-    total_cost = 105.0*1 + 106.0*2 + 107.0*3
-    vwap = total_cost / 6.0
-    mid = 0.5 * (99.0 + 105.0)
+    vwap = np.vdot(prices, sizes) / sizes.sum()
+    mid = 0.5 * (99.0 + prices[0])
 
     expected_bps = (vwap / mid - 1.0) * 10000.0
 
@@ -26,8 +25,8 @@ def test_price_impact_buy_full_book():
     assert math.isclose(bps, expected_bps, rel_tol=1e-9)
 
 
-def test_price_impact_partial_and_no_mid():
-    engine = MarketEngine(init_price=100.0, vol=0.0, rng=None)
+def test_price_impact_partial_and_no_mid(fresh_engine):
+    engine = fresh_engine
 
     # no bids present -> mid undefined -> expect 0
     engine.place_order({'side': 'sell', 'price': 105.0, 'size': 1.0, 'bot': None})
@@ -40,3 +39,30 @@ def test_price_impact_partial_and_no_mid():
     # Only one sell of size 1 -> partial fill
     bps = engine.calculate_price_impact('buy', 5)
     assert bps > 0.0
+
+
+def test_price_impact_curve_matches_single_calls(fresh_engine):
+    engine = fresh_engine
+    engine.place_orders_batch(['buy', 'buy', 'sell', 'sell'], np.array([99.0, 98.0, 101.0, 103.0]),
+                              np.array([2.0, 3.0, 1.0, 4.0]))
+
+    sizes = [0, 1, 2, 5, 8]
+    for side in ('buy', 'sell'):
+        curve = engine.calculate_price_impact_curve(side, sizes)
+        expected = [engine.calculate_price_impact(side, q) for q in sizes]
+        assert np.allclose(curve, expected, rtol=1e-12, atol=1e-9)
+
+
+def test_impact_curve_kernels_agree_with_single_calls(fresh_engine):
+    # `calculate_price_impact_curve` only reaches one of these, depending on HAVE_NUMBA
+    engine = fresh_engine
+    engine.place_orders_batch(['buy', 'buy', 'sell', 'sell'], [99.0, 98.0, 101.0, 103.0], [2.0, 3.0, 1.0, 4.0])
+    mid = 0.5 * (99.0 + 101.0)
+
+    sizes = [-1, 0, 1, 2, 5, 8, 20]  # ints, as calculate_price_impact takes (the mypyc build enforces it)
+    for side in ('buy', 'sell'):
+        prices, depth = engine.level_arrays('sell' if side == 'buy' else 'buy')
+        expected = [engine.calculate_price_impact(side, q) for q in sizes]
+        for kernel in (impact_curve, _impact_curve_np):
+            curve = kernel(prices, depth, mid, np.array(sizes, dtype=np.float64), side == 'buy')
+            np.testing.assert_allclose(curve, expected, rtol=1e-12, atol=1e-9)
@@ -1,6 +1,12 @@
 from __future__ import annotations
+import copy
+import io
 import os
+import pickle
+from collections.abc import Mapping
 from pathlib import Path
+import numpy as np
+import pandas as pd
 import pytest
 
 from simulate import run_simulation
@@ -15,6 +21,12 @@ def test_run_simulation_creates_plot(tmp_path: Path):
     assert Path(out_path).stat().st_size > 0, "Output plot is empty"
 
 
+def test_run_simulation_writes_to_file_object():
+    buf = io.BytesIO()
+    assert run_simulation(ticks=10, seed=42, savepath=buf) is buf
+    assert buf.getvalue().startswith(b"\x89PNG")
+
+
 def test_market_maker_posts_orders():
     # Quick unit check that a MarketMaker posts two orders on a tick
     engine = MarketEngine(init_price=100.0, vol=0.0, rng=None)
@@ -23,93 +35,129 @@ def test_market_maker_posts_orders():
 
     # Before stepping, no orders
     assert len(engine.order_book) == 0
-    engine.step()
+    # the bare state update: no random-walk draw or snapshot logging
+    engine._step_core(engine.true_price)
     # After one tick, the MarketMaker should have posted at least two orders
     assert len(engine.order_book) >= 2
     sides = {o['side'] for o in engine.order_book}
     assert 'buy' in sides and 'sell' in sides
 
 
-def test_sweep_the_book():
-    """A large buy order sweeps multiple sell orders at increasing prices.
-
-    Setup:
-    - Place three sell orders at prices [105, 106, 107] with sizes [1, 2, 3]
-    - Place one large buy order with price 110 and size 6
+@pytest.fixture
+def engine(fresh_engine):
+    return fresh_engine
 
-    Expectation:
-    - Three trades occur in order and trade prices correspond to midpoints with the buy price
-    - Trade sizes match available sizes
-    - The order book is empty after matching
-    """
 
-    engine = MarketEngine(init_price=100.0, vol=0.0, rng=None)
+def _sell(price, size, bot=None):
+    return {'side': 'sell', 'price': price, 'size': size, 'bot': bot}
 
-    # Place sell orders (best to worst)
-    sells = [
-        {'side': 'sell', 'price': 105.0, 'size': 1.0, 'bot': None},
-        {'side': 'sell', 'price': 106.0, 'size': 2.0, 'bot': None},
-        {'side': 'sell', 'price': 107.0, 'size': 3.0, 'bot': None},
-    ]
-    for s in sells:
-        engine.place_order(s)
 
-    # Large buy that should sweep all sells
-    buy = {'side': 'buy', 'price': 110.0, 'size': 6.0, 'bot': None}
-    engine.place_order(buy)
+@pytest.mark.parametrize("asks,buy,expected_trades,expected_book", [
+    # sweep: a large buy clears three sells at increasing prices; trades print at the midpoint
+    # with the buy price, level by level, and the book ends empty
+    pytest.param([_sell(105.0, 1.0), _sell(106.0, 2.0), _sell(107.0, 3.0)], (110.0, 6.0),
+                 [(107.5, 1.0), (108.0, 2.0), (108.5, 3.0)], [], id="sweep_the_book"),
+    # partial fill: a smaller buy leaves the rest of the sell resting
+    pytest.param([_sell(105.0, 5.0)], (105.0, 2.0),
+                 [(105.0, 2.0)], [('sell', 105.0, 3.0, None)], id="partial_fill_remaining"),
+    # price-time priority: at one price the earlier sell ('A') fills before the later one ('B')
+    pytest.param([_sell(105.0, 3.0, 'A'), _sell(105.0, 3.0, 'B')], (105.0, 4.0),
+                 [(105.0, 3.0), (105.0, 1.0)], [('sell', 105.0, 2.0, 'B')], id="price_time_priority"),
+])
+def test_matching(engine, asks, buy, expected_trades, expected_book):
+    engine.place_orders(asks)
+    engine.place_order({'side': 'buy', 'price': buy[0], 'size': buy[1], 'bot': None})
 
-    # Run matching directly
     engine._match_orders()
 
-    # Verify three trades occurred
-    assert len(engine.trade_history) == 3
+    trades = engine.trade_history
+    np.testing.assert_allclose(trades['price'], [p for p, _ in expected_trades], rtol=0, atol=1e-6)
+    np.testing.assert_array_equal(trades['size'], [s for _, s in expected_trades])
+    assert [(o.side, o.price, o.size, o.bot) for o in engine.order_book] == expected_book
 
-    # Expected trade prices are midpoints with the buy price
-    expected_prices = [0.5 * (110.0 + p) for p in [105.0, 106.0, 107.0]]
-    actual_prices = [round(t['price'], 6) for t in engine.trade_history]
-    assert actual_prices == [round(p, 6) for p in expected_prices]
 
-    # Expected sizes
-    expected_sizes = [1.0, 2.0, 3.0]
-    actual_sizes = [t['size'] for t in engine.trade_history]
-    assert actual_sizes == expected_sizes
+def test_run_matches_step_path_for_a_seeded_engine():
+    stepped = MarketEngine(init_price=100.0, vol=0.5, rng=np.random.default_rng(7))
+    for _ in range(200):
+        stepped.step()
 
-    # Book should be empty
-    assert engine.order_book == []
+    ran = MarketEngine(init_price=100.0, vol=0.5, rng=np.random.default_rng(7))
+    ran.run(200)
 
+    assert ran.tick == stepped.tick == 200
+    assert len(ran.true_history) == 201
+    np.testing.assert_allclose(ran.true_history, stepped.true_history)
+    assert ran.true_price == ran.true_history[-1]
 
-def test_partial_fill_remaining():
-    engine = MarketEngine(init_price=100.0, vol=0.0, rng=None)
 
-    # One large sell order and a smaller buy -> remaining sell should be left
-    engine.place_order({'side': 'sell', 'price': 105.0, 'size': 5.0, 'bot': None})
-    engine.place_order({'side': 'buy', 'price': 105.0, 'size': 2.0, 'bot': None})
+def test_lob_log_written_every_n_ticks(tmp_path: Path):
+    import json
 
-    engine._match_orders()
+    log = tmp_path / "lob.jsonl"
+    engine = MarketEngine(init_price=100.0, vol=0.0, rng=None, log_path=str(log), log_every_n_ticks=5)
+    engine.register_bot(MarketMaker(spread=1.0, size=1.0, jitter=0.0))
+    engine.run(12)
+    engine.close()
 
-    # One trade of size 2, remaining sell size 3 in the book
-    assert len(engine.trade_history) == 1
-    assert engine.trade_history[0]['size'] == 2.0
-    assert len(engine.order_book) == 1
-    assert engine.order_book[0]['side'] == 'sell' and engine.order_book[0]['size'] == 3.0
+    records = [json.loads(line) for line in log.read_text().splitlines()]
+    assert [r['tick'] for r in records] == [5, 10]
+    sides = {o['side'] for o in records[-1]['book']}
+    assert sides == {'buy', 'sell'}
+    assert sum(o['size'] for o in records[-1]['book'] if o['side'] == 'buy') == 10.0
 
 
-def test_price_time_priority():
-    engine = MarketEngine(init_price=100.0, vol=0.0, rng=None)
+def test_lob_log_is_flushed_without_close_and_blocks_pickling(tmp_path: Path):
+    import json
+    import subprocess
+    import sys
+
+    log = tmp_path / "lob.jsonl"
+    script = ("from market_engine import MarketEngine\n"
+              f"engine = MarketEngine(vol=0.0, rng=None, log_path={str(log)!r}, log_every_n_ticks=1)\n"
+              "engine.run(50)\n")  # exits without close()
+    subprocess.run([sys.executable, "-c", script], check=True, cwd=Path(__file__).resolve().parents[1])
+    assert [json.loads(line)['tick'] for line in log.read_text().splitlines()] == list(range(1, 51))
+
+    with MarketEngine(vol=0.0, rng=None, log_path=str(tmp_path / "other.jsonl")) as engine:
+        with pytest.raises(TypeError, match="close"):
+            copy.deepcopy(engine)
+    pickle.dumps(engine)  # closed on exit, so it pickles again
 
-    # Two sells at same price; first should be consumed before the second (time priority)
-    engine.place_order({'side': 'sell', 'price': 105.0, 'size': 3.0, 'bot': 'A'})
-    engine.place_order({'side': 'sell', 'price': 105.0, 'size': 3.0, 'bot': 'B'})
 
-    # Buy that partially fills both
-    engine.place_order({'side': 'buy', 'price': 105.0, 'size': 4.0, 'bot': None})
+def test_match_across_levels_leaves_no_filled_orders():
+    engine = MarketEngine(init_price=100.0, vol=0.0, rng=None)
+    for i in range(50):
+        engine.place_order({'side': 'sell', 'price': 100.0 + 0.1 * (i % 10), 'size': 1.0, 'bot': None})
+    engine.place_order({'side': 'buy', 'price': 100.45, 'size': 23.0, 'bot': None})
 
     engine._match_orders()
 
-    # Expect two trades: 3 then 1
-    sizes = [t['size'] for t in engine.trade_history]
-    assert sizes == [3.0, 1.0]
+    # the five levels up to 100.4 (25 units) absorb the buy; no zero-size orders or empty levels remain
+    assert engine.trade_history['size'].sum() == 23.0
+    assert all(o['size'] > 0 for o in engine.order_book)
+    assert all(len(level) > 0 for level in engine.asks.values())
+    assert engine.best_ask() == 100.4 and engine.best_ask_size == 2.0
+    assert engine.best_bid() is None
+
 
-    # Remaining order should be the second sell (bot 'B') with size 2
-    assert len(engine.order_book) == 1
-    assert engine.order_book[0]['bot'] == 'B' and engine.order_book[0]['size'] == 2.0
+def test_resting_orders_support_attribute_and_dict_access():
+    engine = MarketEngine(init_price=100.0, vol=0.0, rng=None)
+    engine.place_order({'side': 'buy', 'price': 99, 'size': 2, 'bot': 'A'})
+    o = engine.order_book[0]
+    assert (o.side, o.price, o.size, o.bot) == ('buy', 99.0, 2.0, 'A')
+    assert o['price'] == 99.0 and o.get('bot') == 'A' and o.get('missing', 1) == 1
+    assert dict(o) == {'side': 'buy', 'price': 99.0, 'size': 2.0, 'bot': 'A', '_id': o._id}
+    assert isinstance(o, Mapping) and list(o) == list(o.keys()) and dict(o.items()) == dict(o)
+    with pytest.raises(AttributeError):
+        o.extra = 1
+
+    engine.place_order({'side': 'sell', 'price': 101, 'size': 1, 'bot': None})
+    frame = pd.DataFrame(engine.order_book)
+    assert frame.shape == (2, 5) and frame['price'].tolist() == [99.0, 101.0]
+
+
+def test_engine_with_resting_orders_round_trips_through_pickle(engine):
+    engine.place_orders([_sell(101.0, 1.0, 'A'), _sell(102.0, 2.0)])
+    for clone in (copy.deepcopy(engine), pickle.loads(pickle.dumps(engine))):
+        assert [dict(o) for o in clone.order_book] == [dict(o) for o in engine.order_book]
+        assert clone.level_size == engine.level_size